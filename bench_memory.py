@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for the in-memory preset representation.
+
+Builds synthetic libraries of 10k and 100k presets from OsmosePresets.json and reports
+the bytes retained per preset by the original dict-backed dataclass, by the current
+slotted Preset with interned strings, and by the whole PresetStore the app keeps (the
+presets plus their search haystacks, indexes and stats) with each backend.
+"""
+
+import gc
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from osmose_presets.preset_data import PRESET_DATA, PresetData, PresetStore
+
+
+@dataclass
+class LegacyPreset:
+   """The original representation, kept here as the baseline."""
+
+   pack: str
+   type: str
+   cc0: int
+   pgm: int
+   preset: str
+   chars: List[str] = field(default_factory=list)
+
+
+def legacy_load_from_json(file_path: str) -> list[LegacyPreset]:
+   with open(file_path, "r", encoding="utf-8") as f:
+      data = json.load(f)
+   return [
+      LegacyPreset(
+         pack=d.get("pack"),
+         type=d.get("type"),
+         cc0=d.get("cc0"),
+         pgm=d.get("pgm"),
+         preset=d.get("preset"),
+         chars=d.get("chars", []),
+      )
+      for d in data
+   ]
+
+
+def write_library(count: int) -> str:
+   """Write a JSON library of count presets with unique names, like a merged set of packs."""
+   with open(PRESET_DATA, "r", encoding="utf-8") as f:
+      base = json.load(f)
+   library = []
+   for i in range(count):
+      preset = dict(base[i % len(base)])
+      preset["preset"] = f"{preset['preset']} {i // len(base)}"
+      library.append(preset)
+   fd, path = tempfile.mkstemp(suffix=".json")
+   with os.fdopen(fd, "w", encoding="utf-8") as f:
+      json.dump(library, f)
+   return path
+
+
+def retained_bytes(loader, path: str) -> int:
+   """Bytes still allocated after loading, i.e. what the loaded object keeps alive."""
+   gc.collect()
+   tracemalloc.start()
+   presets = loader(path)
+   gc.collect()
+   current, _ = tracemalloc.get_traced_memory()
+   tracemalloc.stop()
+   del presets
+   return current
+
+
+def store_loader(backend: str):
+   return lambda path: PresetStore.build(PresetData.load_from_json(path), backend)
+
+
+def main():
+   # the legacy app kept only its list of presets, the current one keeps a PresetStore
+   loaders = {
+      "legacy list": legacy_load_from_json,
+      "slotted list": PresetData.load_from_json,
+      "index store": store_loader("index"),
+      "columnar store": store_loader("columnar"),
+   }
+   print("bytes retained per preset, and the saving against the legacy list")
+   print(f"{'presets':>8}" + "".join(f" {name:>22}" for name in loaders))
+   for count in (10_000, 100_000):
+      path = write_library(count)
+      try:
+         per_preset = {name: retained_bytes(loader, path) / count for name, loader in loaders.items()}
+      finally:
+         os.remove(path)
+      legacy = per_preset["legacy list"]
+      print(f"{count:>8}" + "".join(f" {size:14.1f} ({1 - size / legacy:4.0%})" for size in per_preset.values()))
+
+
+if __name__ == "__main__":
+   main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for preset search.
+
+Compares the original string-splitting evaluate_search, run on preset names as it
+was, with the compiled query tree from osmose_presets.search_query, run the way
+PresetData runs it: on each preset's lowercased haystack (Preset.get_haystack()).
+Reports the cost per preset.
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from osmose_presets.preset_data import PresetData
+from osmose_presets.search_query import compile_query
+
+
+QUERIES = [
+   "bass",
+   "acid bass",
+   "pad AND warm",
+   "quick AND brown OR cat AND mouse",
+   "lead OR bass OR pad OR keys",
+]
+
+
+def legacy_evaluate_search(search_term, target_string):
+   """The pre-compiler implementation, kept here as the baseline."""
+   or_clauses = [clause.strip() for clause in search_term.split(" OR ")]
+   and_results = (all(term.strip() in target_string for term in clause.split(" AND ")) for clause in or_clauses)
+   return any(and_results)
+
+
+def bench(presets: list, repeat: int) -> None:
+   names = [preset.preset for preset in presets]
+   haystacks = [preset.get_haystack() for preset in presets]
+   print(f"{len(presets)} presets, best of {repeat} runs\n")
+   print(f"{'query':40} {'legacy ns/preset':>18} {'compiled ns/preset':>20} {'speed-up':>10}")
+   for query in QUERIES:
+
+      def legacy_run(query=query):
+         return [legacy_evaluate_search(query, name) for name in names]
+
+      def compiled_run(query=query):
+         compiled = compile_query(query)
+         return [compiled.matches(haystack, presets, row) for row, haystack in enumerate(haystacks)]
+
+      legacy = min(timeit.repeat(legacy_run, number=1, repeat=repeat))
+      compiled = min(timeit.repeat(compiled_run, number=1, repeat=repeat))
+      legacy_ns = legacy / len(presets) * 1e9
+      compiled_ns = compiled / len(presets) * 1e9
+      print(f"{query:40} {legacy_ns:18.1f} {compiled_ns:20.1f} {legacy_ns / compiled_ns:9.1f}x")
+
+
+def main():
+   presets = list(PresetData.get_all_presets())
+   # scale up to something closer to a merged third-party library
+   scale = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+   bench(presets * scale, repeat=5)
+
+
+if __name__ == "__main__":
+   main()
@@ -1,6 +1,13 @@
 import mido
 import time
 import platform
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from osmose_presets.midi_timing import MidiTiming
 
 def get_port_name() -> str:
    if platform.system() == "Darwin":  # macOS
@@ -9,7 +16,9 @@ def get_port_name() -> str:
       port_name = "MIDIOUT2 (Osmose) 2"
    return port_name
 
-def open_midi_port(port_name: str, delay: float = 0.5) -> mido.ports.BaseOutput:
+def open_midi_port(port_name: str, delay: float | None = None) -> mido.ports.BaseOutput:
+   if delay is None:
+      delay = MidiTiming.get_profile(port_name).reset_delay
    try:
       midi_port = mido.open_output(port_name)
       print(f"Initially opened port: {port_name}")
@@ -1,15 +1,20 @@
+from textual.cache import LRUCache
 from textual.widgets import DataTable
 from textual.widgets._data_table import (
+   Row,
+   RowDoesNotExist,
+   RowKey,
    RowRenderables,
    default_cell_formatter,
    _EMPTY_TEXT,
 )
+from textual.geometry import Region
 from textual.message import Message
 from textual.events import Click
 from textual.events import MouseDown
 from rich.console import RenderableType
 from rich.text import Text
-from typing import Literal
+from typing import Literal, Sequence
 from itertools import zip_longest
 
 
@@ -19,12 +24,197 @@ class AlignedDataTableClicked(Message):
    pass
 
 
+class _VirtualRowLocations:
+   """Stands in for DataTable's row key <-> index TwoWayDict: row i has RowKey(i)."""
+
+   def __init__(self, source: Sequence) -> None:
+      self.source = source
+
+   def get(self, row_key) -> int | None:
+      index = getattr(row_key, "value", row_key)
+      if isinstance(index, int) and 0 <= index < len(self.source):
+         return index
+      return None
+
+   def get_key(self, index: int) -> RowKey | None:
+      if 0 <= index < len(self.source):
+         return RowKey(index)
+      return None
+
+   def __contains__(self, row_key) -> bool:
+      return self.get(row_key) is not None
+
+   def __iter__(self):
+      return (RowKey(index) for index in range(len(self.source)))
+
+   def __len__(self) -> int:
+      return len(self.source)
+
+
+class _VirtualRows(_VirtualRowLocations):
+   """Stands in for DataTable.rows: every virtual row is one line high and unlabelled."""
+
+   def get(self, row_key, default=None) -> Row | None:
+      index = super().get(row_key)
+      return default if index is None else Row(RowKey(index), 1)
+
+   def __getitem__(self, row_key) -> Row:
+      row = self.get(row_key)
+      if row is None:
+         raise KeyError(row_key)
+      return row
+
+   def values(self):
+      return (Row(RowKey(index), 1) for index in range(len(self.source)))
+
+   def clear(self) -> None:
+      pass
+
+
+class _VirtualData(_VirtualRowLocations):
+   """Stands in for DataTable._data, fetching a row's cells from the source on demand."""
+
+   def __init__(self, source: Sequence, table: DataTable) -> None:
+      super().__init__(source)
+      self.table = table
+
+   def get(self, row_key, default=None) -> dict | None:
+      index = super().get(row_key)
+      if index is None:
+         return default
+      return dict(zip((column.key for column in self.table.ordered_columns), self.source[index]))
+
+   def __getitem__(self, row_key) -> dict:
+      cells = self.get(row_key)
+      if cells is None:
+         raise KeyError(row_key)
+      return cells
+
+   def items(self):
+      return ((row_key, self[row_key]) for row_key in self)
+
+   def clear(self) -> None:
+      pass
+
+
+class _VirtualRowSequence(Sequence):
+   """Lazy ordered_rows / _y_offsets: items are built on access, slices stay lazy."""
+
+   def __init__(self, indexes: range, make_item) -> None:
+      self.indexes = indexes
+      self.make_item = make_item
+
+   def __len__(self) -> int:
+      return len(self.indexes)
+
+   def __getitem__(self, position):
+      if isinstance(position, slice):
+         return _VirtualRowSequence(self.indexes[position], self.make_item)
+      return self.make_item(self.indexes[position])
+
+   def clear(self) -> None:
+      pass
+
+
 class AlignedDataTable(DataTable):
    """A DataTable subclass that supports column alignment for both headers and cells."""
 
+   # formatted cells kept per (row key, column key) for redraws; a few screens' worth of rows
+   CELL_CACHE_SIZE = 10000
+
    def __init__(self, *args, **kwargs):
       super().__init__(*args, **kwargs)
       self._column_alignments = {}
+      self._plain_columns = set()
+      self._row_source: Sequence | None = None
+      self._cell_renderables: LRUCache[tuple, RenderableType] = LRUCache(self.CELL_CACHE_SIZE)
+
+   # Virtual mode: only the rows being drawn are read from the source, so a new result is
+   # swapped in at O(1). Virtual rows are one line high, keyed RowKey(index), and need
+   # columns with a width. The source owns the rows, so the row editing methods raise
+   # TypeError until clear(). This swaps out DataTable internals private to Textual, so
+   # it is checked against the Textual versions pinned in pyproject.toml.
+   def set_row_source(self, source: Sequence) -> None:
+      """Show the rows of source (len() and [index] are all that's used) in virtual mode."""
+      self._row_source = source
+      self._data = _VirtualData(source, self)
+      self.rows = _VirtualRows(source)
+      self._row_locations = _VirtualRowLocations(source)
+      self._new_rows.clear()
+      self._updated_cells.clear()
+      self.refresh_row_source()
+
+   def refresh_row_source(self) -> None:
+      """Redraw after the current row source changed in place (rows inserted or removed)."""
+      # virtual row keys are positions, so every cached cell may now belong to another row
+      self._cell_renderables.clear()
+      self._clear_caches()
+      self._update_count += 1
+      self._require_update_dimensions = True
+      # re-clamp the cursor to the new row count
+      self.cursor_coordinate = self.cursor_coordinate
+      self.refresh()
+
+   @property
+   def is_virtual(self) -> bool:
+      return self._row_source is not None
+
+   def _require_owned_rows(self, action: str) -> None:
+      if self._row_source is not None:
+         raise TypeError(f"can't {action} in virtual mode: change the row source and call refresh_row_source(), or clear() first")
+
+   def clear(self, columns: bool = False):
+      """Clear the table, leaving virtual mode if it was on."""
+      self._cell_renderables.clear()
+      if self._row_source is not None:
+         self._row_source = None
+         self._data = {}
+         self.rows = {}
+      return super().clear(columns)
+
+   @property
+   def _y_offsets(self):
+      if self._row_source is None:
+         return DataTable._y_offsets.fget(self)
+      return _VirtualRowSequence(range(len(self._row_source)), lambda index: (RowKey(index), 0))
+
+   @property
+   def ordered_rows(self):
+      if self._row_source is None:
+         return DataTable.ordered_rows.fget(self)
+      return _VirtualRowSequence(range(len(self._row_source)), lambda index: Row(RowKey(index), 1))
+
+   def get_row(self, row_key):
+      if self._row_source is None:
+         return super().get_row(row_key)
+      row_index = self._row_locations.get(row_key)
+      if row_index is None:
+         raise RowDoesNotExist(f"Row key {row_key!r} is not valid.")
+      return list(self._row_source[row_index])
+
+   def get_row_at(self, row_index: int):
+      if self._row_source is None:
+         return super().get_row_at(row_index)
+      if not self.is_valid_row_index(row_index):
+         raise RowDoesNotExist(f"Row index {row_index!r} is not valid.")
+      return list(self._row_source[row_index])
+
+   def _virtual_row_y(self, row_index: int) -> int:
+      return row_index + (self.header_height if self.show_header else 0)
+
+   def _get_row_region(self, row_index: int) -> Region:
+      if self._row_source is None or not self.is_valid_row_index(row_index):
+         return super()._get_row_region(row_index)
+      row_width = sum(column.get_render_width(self) for column in self.columns.values()) + self._row_label_column_width
+      return Region(0, self._virtual_row_y(row_index), max(self.size.width, row_width), 1)
+
+   def _get_cell_region(self, coordinate) -> Region:
+      if self._row_source is None or not self.is_valid_coordinate(coordinate):
+         return super()._get_cell_region(coordinate)
+      row_index, column_index = coordinate
+      x = sum(column.get_render_width(self) for column in self.ordered_columns[:column_index]) + self._row_label_column_width
+      width = self.ordered_columns[column_index].get_render_width(self)
+      return Region(x, self._virtual_row_y(row_index), width, 1)
 
    def add_column(
       self,
@@ -34,6 +224,7 @@ class AlignedDataTable(DataTable):
       key=None,
       default=None,
       justify: Literal["left", "center", "right"] = "left",
+      markup: bool = True,
    ) -> str:
       """Add a column to the table with optional alignment for label and data cells.
 
@@ -43,6 +234,7 @@ class AlignedDataTable(DataTable):
          key: A key which uniquely identifies this column.
          default: The default value to insert into pre-existing rows.
          justify: Horizontal alignment of the column label and cells.
+         markup: False if string cells are plain text, which skips markup parsing.
 
       Returns:
          The column key (auto-generated if not provided).
@@ -51,8 +243,43 @@ class AlignedDataTable(DataTable):
       aligned_label = Text.from_markup(label, justify=justify)
       column_key = super().add_column(aligned_label, width=width, key=key, default=default)
       self._column_alignments[column_key] = justify
+      if not markup:
+         self._plain_columns.add(column_key)
       return column_key
 
+   def set_column_alignment(self, column_key, justify: Literal["left", "center", "right"]) -> None:
+      """Change the alignment of a column's cells."""
+      self._column_alignments[column_key] = justify
+      self._cell_renderables.clear()
+      self._clear_caches()
+      self.refresh()
+
+   def add_row(self, *cells, height: int | None = 1, key: str | None = None, label=None) -> RowKey:
+      self._require_owned_rows("add rows")
+      return super().add_row(*cells, height=height, key=key, label=label)
+
+   def sort(self, *columns, key=None, reverse: bool = False):
+      self._require_owned_rows("sort rows")
+      return super().sort(*columns, key=key, reverse=reverse)
+
+   def update_cell(self, row_key, column_key, value, *, update_width: bool = False) -> None:
+      # update_cell_at goes through here too
+      self._require_owned_rows("update cells")
+      # row and column keys hash like the strings they wrap, so either form finds the entry
+      self._cell_renderables.discard((row_key, column_key))
+      super().update_cell(row_key, column_key, value, update_width=update_width)
+
+   def remove_row(self, row_key) -> None:
+      self._require_owned_rows("remove rows")
+      # a later row may reuse the key
+      self._cell_renderables.clear()
+      super().remove_row(row_key)
+
+   def remove_column(self, column_key) -> None:
+      self._cell_renderables.clear()
+      self._plain_columns.discard(column_key)
+      super().remove_column(column_key)
+
    def _compute_row_renderables(self, row_index: int) -> RowRenderables:
       """Override to apply column alignment during cell formatting."""
       ordered_columns = self.ordered_columns
@@ -61,7 +288,6 @@ class AlignedDataTable(DataTable):
          header_row: list[RenderableType] = [column.label for column in ordered_columns]
          return RowRenderables(None, header_row)
 
-      ordered_row = self.get_row_at(row_index)
       row_key = self._row_locations.get_key(row_index)
       if row_key is None:
          return RowRenderables(None, [])
@@ -70,20 +296,27 @@ class AlignedDataTable(DataTable):
       if row_metadata is None:
          return RowRenderables(None, [])
 
-      formatted_row_cells: list[RenderableType] = [
-         (
-            _EMPTY_TEXT
-            if datum is None
-            else self._aligned_cell_formatter(
-               datum,
-               column_key,
-               wrap=row_metadata.height != 1,
-               height=row_metadata.height,
-            )
-            or _EMPTY_TEXT
-         )
-         for datum, column_key in zip_longest(ordered_row, self.columns)
-      ]
+      cache = self._cell_renderables
+      formatted_row_cells: list[RenderableType] = [cache.get((row_key, column_key)) for column_key in self.columns]
+      if None in formatted_row_cells:
+         # only fetch (and format) the row when some of its cells aren't cached yet
+         formatted_row_cells = []
+         for datum, column_key in zip_longest(self.get_row_at(row_index), self.columns):
+            renderable = cache.get((row_key, column_key))
+            if renderable is None:
+               renderable = (
+                  _EMPTY_TEXT
+                  if datum is None
+                  else self._aligned_cell_formatter(
+                     datum,
+                     column_key,
+                     wrap=row_metadata.height != 1,
+                     height=row_metadata.height,
+                  )
+                  or _EMPTY_TEXT
+               )
+               cache[(row_key, column_key)] = renderable
+            formatted_row_cells.append(renderable)
 
       label = default_cell_formatter(row_metadata.label, wrap=False, height=1) if row_metadata.label is not None else None
 
@@ -93,6 +326,8 @@ class AlignedDataTable(DataTable):
       """Custom cell formatter that applies column alignment."""
       justify = self._column_alignments.get(column_key, "left")
       if isinstance(obj, str):
+         if column_key in self._plain_columns:
+            return Text(obj, justify=justify)
          return Text.from_markup(obj, justify=justify)
       elif isinstance(obj, float):
          content = f"{obj:.2f}"
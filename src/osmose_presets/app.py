@@ -3,13 +3,19 @@ from textual.containers import Horizontal, Vertical, VerticalScroll
 from textual.widgets import Header, Footer
 from textual import on
 from textual import log
+from textual import work
 from osmose_presets.preset_grid import PresetGrid
 from osmose_presets.header_panel import HeaderPanel
 from osmose_presets.filter_selector import FilterSelector
 from osmose_presets.filters import Filters
+from osmose_presets.preset_data import PresetData
+from osmose_presets.helper_functions import Helper
 from osmose_presets.messages import (
+   PresetsLoaded,
    FilterSelectionChanged,
    SearchSubmitted,
+   SearchChanged,
+   FacetCountsChanged,
    RestorePreviousFocus,
    PresetSelected,
 )
@@ -48,6 +54,36 @@ class OsmosePresetsApp(App):
 
    def on_mount(self) -> None:
       self.focus_filter_selector("#pack-container")
+      self.load_presets()
+
+   @work(thread=True, exit_on_error=True)
+   def load_presets(self) -> None:
+      """Parse the preset library off the event loop so the first frame isn't held up."""
+      backend = Helper.get_config_value("preset_backend")
+      if backend:
+         try:
+            PresetData.use_backend(backend)
+         except ValueError as e:
+            log(f"Ignoring preset_backend in config: {e}")
+      cache_size = Helper.get_config_value("filter_cache_size")
+      if cache_size is not None:
+         try:
+            PresetData.set_result_cache_size(int(cache_size))
+         except ValueError as e:
+            log(f"Ignoring filter_cache_size in config: {e}")
+      PresetData.load()
+      self.post_message(PresetsLoaded())
+
+   @on(PresetsLoaded)
+   async def handle_presets_loaded(self, message: PresetsLoaded) -> None:
+      self.query_one("#preset-grid", PresetGrid).add_columns()
+      for filter_selector in self.query(FilterSelector):
+         await filter_selector.populate()
+
+   def on_unmount(self) -> None:
+      log(f"Filter result cache: {PresetData.get_result_cache_stats()}")
+      MidiController.shutdown()
+      Helper.flush_config()
 
    def compose(self) -> ComposeResult:
       yield Header()
@@ -126,6 +162,17 @@ class OsmosePresetsApp(App):
       self.remove_all_focused_border_titles()
       self.set_focus_to_one_border_title("#preset-grid")
 
+   @on(SearchChanged)
+   def handle_search_changed(self, message: SearchChanged) -> None:
+      """Handle live search while the user is still typing; focus stays in the search box."""
+      preset_grid = self.app.query_one("#preset-grid", PresetGrid)
+      preset_grid.set_search_filter(message.search_term)
+
+   @on(FacetCountsChanged)
+   def handle_facet_counts_changed(self, message: FacetCountsChanged) -> None:
+      for filter_selector in self.query(FilterSelector):
+         filter_selector.show_counts(message.counts.get(filter_selector.get_filter(), {}))
+
    @on(RestorePreviousFocus)
    def handle_restore_focus(self, message: RestorePreviousFocus) -> None:
       """Handle request to restore focus to previous widget."""
@@ -148,7 +195,8 @@ class OsmosePresetsApp(App):
    def preset_selected(self, message: PresetSelected) -> None:
       header_panel = self.app.query_one("#header-panel", HeaderPanel)
       port_name = header_panel.midi_selector.get_current_port_name()
-      MidiController.send_preset_change(port_name, message.cc, message.pgm)
+      # sent from the MIDI sender thread; the UI never waits for the synth
+      MidiController.request_preset_change(port_name, message.cc, message.pgm)
 
 
 def main():
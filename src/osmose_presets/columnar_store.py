@@ -0,0 +1,193 @@
+from array import array
+from typing import Iterable, Sequence
+
+try:
+   import numpy
+except ImportError:
+   numpy = None
+
+from osmose_presets.preset_index import bits_from_indices, indices_from_bits
+
+
+class ColumnarStore:
+   """Struct-of-arrays preset storage.
+
+   cc0 and pgm are byte arrays, pack and type are codes into shared vocabularies, chars
+   are one uint64 bitmask per preset (for filtering) plus a code into the distinct char
+   tuples (for display, keeping their order), and names live in one string with offsets.
+   Filters become batched mask operations: vectorised with NumPy when it is installed,
+   a single pass over the code columns otherwise.
+   """
+
+   def __init__(self, presets: Iterable, preset_type: type) -> None:
+      # the class preset_at builds; passed in because preset_data imports this module
+      self.preset_type = preset_type
+      self.packs: list[str] = []
+      self.types: list[str] = []
+      self.chars: list[str] = []
+      self.char_sets: list[tuple[str, ...]] = []
+      # value -> code lookups for the vocabularies above
+      self.pack_lookup = {}
+      self.type_lookup = {}
+      self.char_lookup = {}
+      self.char_set_lookup = {}
+      self.pack_codes = array("H")
+      self.type_codes = array("H")
+      self.char_set_codes = array("I")
+      self.cc0 = array("B")
+      self.pgm = array("B")
+      self.char_masks = array("Q")
+      names = []
+      for preset in presets:
+         self.append_columns(preset)
+         names.append(preset.preset)
+      self.names = "".join(names)
+      # names appended since names was last joined; joined on the next read, see name_at
+      self.appended_names: list[str] = []
+      self.name_offsets = array("I", [0])
+      for name in names:
+         self.name_offsets.append(self.name_offsets[-1] + len(name))
+
+   def append_columns(self, preset) -> None:
+      self.pack_codes.append(_code(preset.pack, self.pack_lookup, self.packs))
+      self.type_codes.append(_code(preset.type, self.type_lookup, self.types))
+      self.cc0.append(preset.cc0)
+      self.pgm.append(preset.pgm)
+      mask = 0
+      for char in preset.chars:
+         mask |= 1 << _code(char, self.char_lookup, self.chars)
+      if isinstance(self.char_masks, array) and len(self.chars) > 64:
+         # more than 64 distinct chars won't fit a uint64; keep Python ints and skip NumPy
+         self.char_masks = list(self.char_masks)
+      self.char_masks.append(mask)
+      self.char_set_codes.append(_code(tuple(preset.chars), self.char_set_lookup, self.char_sets))
+
+   def append(self, preset) -> None:
+      """Add one preset as the last row."""
+      self.append_columns(preset)
+      # appending to names itself would copy the whole string every time
+      self.appended_names.append(preset.preset)
+      self.name_offsets.append(self.name_offsets[-1] + len(preset.preset))
+
+   def __len__(self) -> int:
+      return len(self.cc0)
+
+   def name_at(self, row: int) -> str:
+      if self.appended_names:
+         self.names += "".join(self.appended_names)
+         self.appended_names = []
+      return self.names[self.name_offsets[row] : self.name_offsets[row + 1]]
+
+   def chars_at(self, row: int) -> tuple[str, ...]:
+      return self.char_sets[self.char_set_codes[row]]
+
+   def preset_at(self, row: int):
+      return self.preset_type(
+         pack=self.packs[self.pack_codes[row]],
+         type=self.types[self.type_codes[row]],
+         cc0=self.cc0[row],
+         pgm=self.pgm[row],
+         preset=self.name_at(row),
+         chars=self.chars_at(row),
+      )
+
+   def match(self, packs: Iterable[str], types: Iterable[str], chars: Iterable[str]) -> int:
+      """Return the bitset of rows whose pack, type and any char are all selected."""
+      allowed_packs = _allowed(self.packs, packs)
+      allowed_types = _allowed(self.types, types)
+      chars = set(chars)
+      char_mask = 0
+      for bit, char in enumerate(self.chars):
+         if char in chars:
+            char_mask |= 1 << bit
+      if numpy is not None and isinstance(self.char_masks, array) and len(self):
+         selected = (
+            numpy.array(allowed_packs)[numpy.frombuffer(self.pack_codes, dtype=numpy.uint16)]
+            & numpy.array(allowed_types)[numpy.frombuffer(self.type_codes, dtype=numpy.uint16)]
+            & (numpy.frombuffer(self.char_masks, dtype=numpy.uint64) & numpy.uint64(char_mask) != 0)
+         )
+         return int.from_bytes(numpy.packbits(selected, bitorder="little").tobytes(), "little")
+      rows = [
+         row
+         for row, (pack, type_, mask) in enumerate(zip(self.pack_codes, self.type_codes, self.char_masks))
+         if allowed_packs[pack] and allowed_types[type_] and mask & char_mask
+      ]
+      return bits_from_indices(rows, len(self))
+
+   def facet_counts(self, packs: Iterable[str], types: Iterable[str], chars: Iterable[str], within: int) -> dict[str, dict[str, int]]:
+      """Count, per pack, type and char value, the rows in within that the other two filters select."""
+      allowed_packs = _allowed(self.packs, packs)
+      allowed_types = _allowed(self.types, types)
+      chars = set(chars)
+      char_mask = 0
+      for bit, char in enumerate(self.chars):
+         if char in chars:
+            char_mask |= 1 << bit
+      pack_counts = [0] * len(self.packs)
+      type_counts = [0] * len(self.types)
+      char_counts = [0] * len(self.chars)
+      if numpy is not None and isinstance(self.char_masks, array) and len(self):
+         within_bytes = numpy.frombuffer(within.to_bytes((len(self) + 7) >> 3, "little"), dtype=numpy.uint8)
+         rows = numpy.unpackbits(within_bytes, bitorder="little")[: len(self)].astype(bool)
+         pack_codes = numpy.frombuffer(self.pack_codes, dtype=numpy.uint16)
+         type_codes = numpy.frombuffer(self.type_codes, dtype=numpy.uint16)
+         masks = numpy.frombuffer(self.char_masks, dtype=numpy.uint64)
+         pack_ok = numpy.array(allowed_packs)[pack_codes] & rows
+         type_ok = numpy.array(allowed_types)[type_codes]
+         char_ok = masks & numpy.uint64(char_mask) != 0
+         pack_counts = numpy.bincount(pack_codes[rows & type_ok & char_ok], minlength=len(self.packs)).tolist()
+         type_counts = numpy.bincount(type_codes[pack_ok & char_ok], minlength=len(self.types)).tolist()
+         selected_masks = masks[pack_ok & type_ok]
+         char_counts = [int(numpy.count_nonzero(selected_masks & numpy.uint64(1 << bit))) for bit in range(len(self.chars))]
+      else:
+         for row in indices_from_bits(within):
+            pack, type_, mask = self.pack_codes[row], self.type_codes[row], self.char_masks[row]
+            pack_ok, type_ok = allowed_packs[pack], allowed_types[type_]
+            if type_ok and mask & char_mask:
+               pack_counts[pack] += 1
+            if pack_ok and mask & char_mask:
+               type_counts[type_] += 1
+            if pack_ok and type_ok:
+               for bit in range(mask.bit_length()):
+                  if mask >> bit & 1:
+                     char_counts[bit] += 1
+      return {
+         "pack": dict(zip(self.packs, pack_counts)),
+         "type": dict(zip(self.types, type_counts)),
+         "char": dict(zip(self.chars, char_counts)),
+      }
+
+   def view(self) -> "PresetColumnView":
+      return PresetColumnView(self)
+
+
+class PresetColumnView(Sequence):
+   """Read-only list of Preset objects, each built from the columns on access."""
+
+   def __init__(self, columns: ColumnarStore) -> None:
+      self.columns = columns
+
+   def __len__(self) -> int:
+      return len(self.columns)
+
+   def __getitem__(self, row):
+      if isinstance(row, slice):
+         return [self.columns.preset_at(i) for i in range(*row.indices(len(self)))]
+      if row < 0:
+         row += len(self)
+      if not 0 <= row < len(self):
+         raise IndexError("preset row out of range")
+      return self.columns.preset_at(row)
+
+
+def _code(value, codes: dict, vocabulary: list) -> int:
+   code = codes.get(value)
+   if code is None:
+      code = codes[value] = len(vocabulary)
+      vocabulary.append(value)
+   return code
+
+
+def _allowed(vocabulary: list[str], selected: Iterable[str]) -> list[bool]:
+   selected = set(selected)
+   return [value in selected for value in vocabulary]
@@ -15,7 +15,16 @@ class MockCheckboxChanged:
 
 
 class FilterSelector(VerticalScroll):
-   def on_mount(self) -> None:
+   async def on_mount(self) -> None:
+      if PresetData.is_loaded():
+         await self.populate()
+
+   async def populate(self) -> None:
+      """Add a checkbox per filter value once the preset library is loaded."""
+      if self.populated:
+         return
+      self.populated = True
+      await self.mount_all(self.make_filter_checkboxes())
       # If select_all is True, simulate user checking all boxes
       if self.select_all:
          # Create a mock event for the "all" checkbox
@@ -30,6 +39,9 @@ class FilterSelector(VerticalScroll):
       self.select_all = select_all
       self.all_updating = False
       self.current_index = 0
+      self.populated = False
+      # checkbox id -> the filter value it stands for; the label also shows a count
+      self.filter_values: dict[str, str] = {}
 
    def get_filter(self) -> str:
       match self.filter:
@@ -59,10 +71,14 @@ class FilterSelector(VerticalScroll):
          title = "character"
       self.border_title = title
       yield Checkbox("all", id="check_all", classes="compact bold-text", value=self.select_all)
-      filter_names = self.get_filter_names()
-      for f_name in filter_names:
+
+   def make_filter_checkboxes(self) -> list[Checkbox]:
+      checkboxes = []
+      for f_name in self.get_filter_names():
          safe_id = f"check_{f_name.lower().replace(' ', '_')}"
-         yield Checkbox(f_name, id=safe_id, classes="compact bold-text", value=self.select_all)
+         self.filter_values[safe_id] = f_name
+         checkboxes.append(Checkbox(f_name, id=safe_id, classes="compact bold-text", value=self.select_all))
+      return checkboxes
 
    def get_other_checkboxes(self) -> list[Checkbox]:
       return [cb for cb in self.query(Checkbox) if cb.id != "check_all"]
@@ -84,13 +100,22 @@ class FilterSelector(VerticalScroll):
             all_box.value = all_are_checked
 
    def get_selected_filters(self) -> list[str]:
-      """return a list of labels for all checked checkboxes except 'all'"""
+      """return a list of the filter values of all checked checkboxes except 'all'"""
       selected = []
       for checkbox in self.query(Checkbox):
          if checkbox.id != "check_all" and checkbox.value:
-            selected.append(str(checkbox.label))
+            selected.append(self.filter_values[checkbox.id])
       return selected
 
+   def show_counts(self, counts: dict[str, int]) -> None:
+      """Show next to each value how many presets it would match, e.g. "bass (42)"."""
+      for checkbox in self.get_other_checkboxes():
+         value = self.filter_values[checkbox.id]
+         label = f"{value} ({counts.get(value, 0)})"
+         # only relabel what changed; every relabel re-renders the checkbox
+         if str(checkbox.label) != label:
+            checkbox.label = label
+
    def filter_selection_changed(self, filter_type: str, selected_filters: list[str]) -> None:
       self.post_message(FilterSelectionChanged(filter_type, selected_filters))
 
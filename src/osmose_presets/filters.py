@@ -1,7 +1,42 @@
+from dataclasses import dataclass, replace
 from enum import Enum
+from typing import Iterable
 
 
 class Filters(Enum):
    PACK = 1
    TYPE = 2
    CHAR = 3
+
+
+@dataclass(frozen=True, slots=True)
+class FilterState:
+   """What a preset view shows: the selected packs, types and chars, and the search text.
+
+   Immutable and hashable, so it can key a cache and be handed to a worker thread as is.
+   A change makes a new state, see with_filter() and with_search().
+   """
+
+   packs: frozenset[str] = frozenset()
+   types: frozenset[str] = frozenset()
+   chars: frozenset[str] = frozenset()
+   search_term: str = ""
+
+   def with_filter(self, filter_type: str, values: Iterable[str]) -> "FilterState":
+      """Return a copy with the "pack", "type" or "char" selection replaced by values."""
+      match filter_type:
+         case "pack":
+            return replace(self, packs=frozenset(values))
+         case "type":
+            return replace(self, types=frozenset(values))
+         case "char":
+            return replace(self, chars=frozenset(values))
+         case _:
+            raise ValueError(f"unknown filter type {filter_type!r}")
+
+   def with_search(self, search_term: str) -> "FilterState":
+      return replace(self, search_term=search_term)
+
+   def selects_anything(self) -> bool:
+      """A preset needs a selected pack, type and char to show, so an empty selection shows nothing."""
+      return bool(self.packs and self.types and self.chars)
@@ -2,10 +2,12 @@ from textual.app import ComposeResult
 from textual.containers import Horizontal, Container
 from textual.widgets import Button, Static, Input
 from textual.events import Key
-from textual import log, on
-import mido
+from textual import log, on, work
 from osmose_presets.helper_functions import Helper
-from osmose_presets.messages import SearchSubmitted, RestorePreviousFocus
+from osmose_presets.messages import SearchSubmitted, SearchChanged, RestorePreviousFocus, MidiPortsChanged
+from osmose_presets.midi_controller import MidiController
+from osmose_presets.midi_port_discovery import MidiPortDiscovery
+from osmose_presets.search_query import FUZZY_PREFIX
 
 
 class MidiPortSelector(Container):
@@ -17,49 +19,54 @@ class MidiPortSelector(Container):
       self.current_port_index = 0
       self.port_display = None
       self.midi_port_name = ""
+      # the port list as last discovered, None until the first enumeration succeeds
+      self.known_ports: tuple[str, ...] | None = None
 
-   # Crashes first time, runs okay the second
    def on_mount(self) -> None:
-      """Load MIDI ports when component is mounted."""
-      try:
-         self.ports = mido.get_output_names()
-         if not self.ports:
-            self.ports = ["No MIDI ports available"]
-
-         # Load saved MIDI port selection
-         config = self.read_config()
-         saved_port = config.get("selected_midi_port", "")
-
-         # If there's a saved port and it exists in the current list of ports
-         if saved_port and saved_port in self.ports:
-            self.current_port_index = self.ports.index(saved_port)
-         else:
-            # Clear invalid port name from config
-            if saved_port:
-               print(f"Invalid MIDI port '{saved_port}' found in config, clearing it.")
-               config["selected_midi_port"] = ""
-               Helper.write_config(config)
-            self.current_port_index = 0
-
-         # CRITICAL: Refresh the current port name in the UI and save it
-         current_port_name = self.get_current_port_name()  # This updates self.midi_port_name
-         if self.port_display:
-            self.port_display.update(current_port_name)
-
-         # Save the currently valid port name to ensure consistency
-         if current_port_name and current_port_name != "No MIDI ports available" and current_port_name != "No ports loaded":
-            self.save_selected_midi_port(current_port_name)
-
-      except Exception as e:
-         print(f"Error getting MIDI ports: {e}")
-         self.ports = ["Error loading MIDI ports"]
-         # Clear port name from config on error
-         config = self.read_config()
-         config["selected_midi_port"] = ""
-         Helper.write_config(config)
-         # Update display even on error
-         if self.port_display:
-            self.port_display.update("Error loading MIDI ports")
+      """Start looking for MIDI ports; they arrive by MidiPortsChanged, so mounting never waits on the MIDI backend."""
+      if self.port_display:
+         self.port_display.update("Looking for MIDI ports...")
+      self.discover_ports()
+      self.set_interval(MidiPortDiscovery.POLL_INTERVAL, self.discover_ports)
+
+   @work(thread=True, exclusive=True, group="midi-ports")
+   def discover_ports(self) -> None:
+      """Enumerate the ports in the background and post the change if the list differs."""
+      ports = MidiPortDiscovery.enumerate()
+      known_ports = self.known_ports
+      if ports is not None and ports != known_ports:
+         added, removed = MidiPortDiscovery.diff(known_ports or (), ports)
+         self.post_message(MidiPortsChanged(ports, added, removed))
+      elif ports is None and MidiPortDiscovery.error and self.port_display:
+         self.app.call_from_thread(self.port_display.update, "Error loading MIDI ports")
+
+   @on(MidiPortsChanged)
+   def handle_ports_changed(self, message: MidiPortsChanged) -> None:
+      message.stop()
+      for port_name in message.removed:
+         # an unplugged device leaves a dead connection behind
+         MidiController.close_output(port_name)
+      self.known_ports = message.ports
+      self.set_ports(message.ports)
+
+   def set_ports(self, ports: tuple[str, ...]) -> None:
+      """Show ports, selecting the saved port if it is there, else staying on the current one.
+
+      The saved port is kept in the config while it is missing, so it is selected again
+      as soon as the device is plugged back in.
+      """
+      selected_port = self.midi_port_name
+      saved_port = Helper.get_config_value("selected_midi_port", "")
+      self.ports = list(ports) or ["No MIDI ports available"]
+      if saved_port in ports:
+         self.current_port_index = self.ports.index(saved_port)
+      elif selected_port in ports:
+         self.current_port_index = self.ports.index(selected_port)
+      else:
+         self.current_port_index = 0
+      current_port_name = self.get_current_port_name()  # This updates self.midi_port_name
+      if self.port_display:
+         self.port_display.update(current_port_name)
 
    def compose(self) -> ComposeResult:
       self.border_title = "MIDI port"
@@ -82,10 +89,8 @@ class MidiPortSelector(Container):
       return Helper.read_config()
 
    def save_selected_midi_port(self, port_name: str) -> None:
-      """Save the selected MIDI port to the config file."""
-      config = self.read_config()
-      config["selected_midi_port"] = port_name
-      Helper.write_config(config)
+      """Save the selected MIDI port to the config file; cycling through ports is written once."""
+      Helper.set_config_value("selected_midi_port", port_name)
 
    def set_focus(self) -> None:
       """Focus the first button (prev port button)."""
@@ -141,13 +146,39 @@ class MidiPortSelector(Container):
 class SearchBox(Container):
    """Right side container for search functionality."""
 
+   # seconds to wait after the last keystroke before searching
+   SEARCH_DEBOUNCE = 0.15
+
+   def __init__(self, **kwargs):
+      super().__init__(**kwargs)
+      self.search_timer = None
+
    def compose(self) -> ComposeResult:
       self.border_title = "Search"
-      yield Input(placeholder="Enter search term...", id="search-input")
+      yield Input(placeholder="Enter search term, ~ for fuzzy...", id="search-input")
+
+   def cancel_pending_search(self) -> None:
+      if self.search_timer:
+         self.search_timer.stop()
+         self.search_timer = None
+
+   @on(Input.Changed, "#search-input")
+   def on_search_input_changed(self, event: Input.Changed) -> None:
+      """Search as the user types, once typing pauses for SEARCH_DEBOUNCE seconds."""
+      search_term = event.value
+      self.show_search_mode(search_term)
+      self.cancel_pending_search()
+      self.search_timer = self.set_timer(self.SEARCH_DEBOUNCE, lambda: self.post_message(SearchChanged(search_term)))
+
+   def show_search_mode(self, search_term: str) -> None:
+      """Title the box "Fuzzy search" while the term starts with FUZZY_PREFIX."""
+      fuzzy = search_term.lstrip().startswith(FUZZY_PREFIX)
+      self.border_title = "Fuzzy search" if fuzzy else "Search"
 
    @on(Input.Submitted, "#search-input")
    def on_search_input_submitted(self, event: Input.Submitted) -> None:
       """Handle Enter key press in the search input."""
+      self.cancel_pending_search()
       search_term = event.value
       self.post_message(SearchSubmitted(search_term))
 
@@ -157,6 +188,7 @@ class SearchBox(Container):
          # Clear the search input field
          search_input = self.query_one("#search-input", Input)
          search_input.value = ""
+         self.cancel_pending_search()
          self.post_message(RestorePreviousFocus())
          self.post_message(SearchSubmitted(""))
          event.stop()
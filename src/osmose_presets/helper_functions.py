@@ -1,8 +1,22 @@
+import atexit
+import contextvars
+import copy
 import os
 import json
+import threading
+from textual import log
 
 
 class Helper:
+   # config.json as last read or written, loaded on first use
+   config: dict | None = None
+   # keys changed in memory since the last flush; only these override the file when it is written
+   dirty_keys: set[str] = set()
+   config_lock = threading.RLock()
+   flush_timer: threading.Timer | None = None
+   # seconds to wait after the last change before writing, so a burst of changes is one write
+   FLUSH_DELAY = 0.5
+
    @staticmethod
    def get_config_path():
       """Return the absolute path to the config.json file in the same directory as this script."""
@@ -10,21 +24,111 @@ class Helper:
       return os.path.join(script_dir, "config.json")
 
    @staticmethod
-   def read_config():
+   def load_config_file():
       config_path = Helper.get_config_path()
       try:
          if os.path.exists(config_path):
             with open(config_path, "r") as f:
-               return json.load(f)
-      except json.decoder.JSONDecodeError:
+               config = json.load(f)
+               return config if isinstance(config, dict) else {}
+      except (json.decoder.JSONDecodeError, OSError):
          return {}
       return {}
 
+   @staticmethod
+   def get_config() -> dict:
+      """The in-memory config, read from disk the first time. Callers must not change it."""
+      with Helper.config_lock:
+         if Helper.config is None:
+            Helper.config = Helper.load_config_file()
+         return Helper.config
+
+   @staticmethod
+   def read_config():
+      """Return a copy of the config, which may be changed and passed to write_config."""
+      with Helper.config_lock:
+         return copy.deepcopy(Helper.get_config())
+
    @staticmethod
    def write_config(config_data):
-      config_path = Helper.get_config_path()
-      with open(config_path, "w") as f:
-         json.dump(config_data, f, indent=2)
+      """Replace the config; only the keys that differ are marked for the next flush."""
+      with Helper.config_lock:
+         config = Helper.get_config()
+         for key in config.keys() - config_data.keys():
+            del config[key]
+            Helper.dirty_keys.add(key)
+         for key, value in config_data.items():
+            if config.get(key) != value or key not in config:
+               config[key] = copy.deepcopy(value)
+               Helper.dirty_keys.add(key)
+         Helper.schedule_flush()
+
+   @staticmethod
+   def get_config_value(key, default=None):
+      return Helper.get_config().get(key, default)
+
+   @staticmethod
+   def set_config_value(key, value):
+      with Helper.config_lock:
+         config = Helper.get_config()
+         if key in config and config[key] == value:
+            return
+         config[key] = copy.deepcopy(value)
+         Helper.dirty_keys.add(key)
+         Helper.schedule_flush()
+
+   @staticmethod
+   def schedule_flush():
+      """(Re)start the flush timer, so only the last of a burst of changes writes the file."""
+      with Helper.config_lock:
+         if not Helper.dirty_keys:
+            return
+         if Helper.flush_timer is not None:
+            Helper.flush_timer.cancel()
+         # the timer thread runs in the caller's context, so a write error is logged to the app
+         Helper.flush_timer = threading.Timer(Helper.FLUSH_DELAY, contextvars.copy_context().run, args=(Helper.flush_config,))
+         Helper.flush_timer.daemon = True
+         Helper.flush_timer.start()
+
+   @staticmethod
+   def flush_config():
+      """Write pending changes now, through a temp file and os.replace.
+
+      The file is re-read first and only the keys changed here are written over it, so
+      settings saved meanwhile by another running instance are kept.
+      """
+      with Helper.config_lock:
+         if Helper.flush_timer is not None:
+            Helper.flush_timer.cancel()
+            Helper.flush_timer = None
+         if not Helper.dirty_keys:
+            return
+         config = Helper.get_config()
+         merged = Helper.load_config_file()
+         for key in Helper.dirty_keys:
+            if key in config:
+               merged[key] = config[key]
+            else:
+               merged.pop(key, None)
+         config_path = Helper.get_config_path()
+         temp_path = f"{config_path}.{os.getpid()}.tmp"
+         try:
+            with open(temp_path, "w") as f:
+               json.dump(merged, f, indent=2)
+            os.replace(temp_path, config_path)
+         except OSError as e:
+            log(f"Error writing {config_path}: {e}")
+            try:
+               os.remove(temp_path)
+            except OSError:
+               pass
+            return
+         Helper.config = merged
+         Helper.dirty_keys.clear()
+
+
+# changes still waiting for the flush timer are written on the way out
+atexit.register(Helper.flush_config)
 
 
 # class Helper:
@@ -1,6 +1,18 @@
 from textual.message import Message
 
 
+class PresetsLoaded(Message):
+   """posted once the preset library has been loaded in the background"""
+
+   pass
+
+
+class PresetsChanged(Message):
+   """posted when presets were added to or removed from the loaded library"""
+
+   pass
+
+
 class FilterSelectionChanged(Message):
    """posted when the selection in a FilterSelector changes"""
 
@@ -10,6 +22,14 @@ class FilterSelectionChanged(Message):
       super().__init__()
 
 
+class FacetCountsChanged(Message):
+   """posted by the PresetGrid with the preset count of every filter value after the result changes"""
+
+   def __init__(self, counts: dict[str, dict[str, int]]) -> None:
+      self.counts = counts
+      super().__init__()
+
+
 class SearchSubmitted(Message):
    """posted when the user submits a search by pressing Enter in the search box"""
 
@@ -18,12 +38,30 @@ class SearchSubmitted(Message):
       super().__init__()
 
 
+class SearchChanged(Message):
+   """posted (debounced) while the user types in the search box"""
+
+   def __init__(self, search_term: str) -> None:
+      self.search_term = search_term
+      super().__init__()
+
+
 class RestorePreviousFocus(Message):
    """posted when the user wants to restore focus to the previously focused widget"""
 
    pass
 
 
+class MidiPortsChanged(Message):
+   """posted when the MIDI port discovery finds ports plugged in or removed"""
+
+   def __init__(self, ports: tuple[str, ...], added: tuple[str, ...], removed: tuple[str, ...]) -> None:
+      self.ports = ports
+      self.added = added
+      self.removed = removed
+      super().__init__()
+
+
 class PresetSelected(Message):
    """posted when the user pressed <ENTER> on the PresetGrid"""
 
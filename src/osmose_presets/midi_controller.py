@@ -1,11 +1,60 @@
+import atexit
+import contextvars
 import mido
+import threading
 import time
+from functools import lru_cache
 from textual import log
+from osmose_presets.midi_timing import MidiTiming
+
+
+class MidiBatch:
+   """A recall's messages, grouped into runs, with the pauses between them.
+
+   Built from mido Messages and pause lengths in seconds, e.g. [bank_select, 0.4, program_change].
+   Messages between two pauses form a run that is sent back to back. str() gives the
+   hex dump, so log calls only format it when something is listening.
+   """
+
+   __slots__ = ("runs",)
+
+   def __init__(self, items) -> None:
+      # (messages, pause after them)
+      runs: list[tuple[tuple[mido.Message, ...], float]] = []
+      messages = []
+      for item in items:
+         if isinstance(item, mido.Message):
+            messages.append(item)
+         else:
+            runs.append((tuple(messages), float(item)))
+            messages = []
+      if messages:
+         runs.append((tuple(messages), 0.0))
+      self.runs = tuple(runs)
+
+   def __str__(self) -> str:
+      return " | ".join(" ".join(message.hex() for message in messages) + (f" | {pause * 1000:g} ms" if pause else "") for messages, pause in self.runs)
+
+   __repr__ = __str__
 
 
 class MidiController:
+   # port name -> output, opened on first use and kept open until close_all()
+   outputs: dict[str, mido.ports.BaseOutput] = {}
+   # held only to read or change outputs, never while a port opens
+   outputs_lock = threading.Lock()
+   # port name -> lock held while that port opens, so it is opened once and other ports aren't held up
+   opening_locks: dict[str, threading.Lock] = {}
+   # the preset change waiting for the sender thread; a newer request replaces it
+   pending: tuple[str, int, int] | None = None
+   pending_changed = threading.Condition()
+   sender: threading.Thread | None = None
+   stopping = False
+
    @staticmethod
-   def open_midi_port(port_name: str, delay: float = 0.5) -> mido.ports.BaseOutput:
+   def open_midi_port(port_name: str, delay: float | None = None) -> mido.ports.BaseOutput:
+      if delay is None:
+         delay = MidiTiming.get_profile(port_name).reset_delay
       try:
          midi_port = mido.open_output(port_name)
          log(f"Initially opened port: {port_name}")
@@ -19,20 +68,133 @@ class MidiController:
          log(f"Error opening {port_name}: {e}")
          raise
 
+   @staticmethod
+   def get_output(port_name: str) -> mido.ports.BaseOutput:
+      """Return the open output for port_name, opening it if it isn't open (or was closed).
+
+      Opening sleeps for the port's reset delay, so it happens outside outputs_lock:
+      close_output, called on the UI thread when a device is unplugged, never waits on it.
+      """
+      with MidiController.outputs_lock:
+         output = MidiController.outputs.get(port_name)
+         if output is not None and not output.closed:
+            return output
+         opening_lock = MidiController.opening_locks.setdefault(port_name, threading.Lock())
+      with opening_lock:
+         with MidiController.outputs_lock:
+            # another thread may have opened it while this one waited
+            output = MidiController.outputs.get(port_name)
+         if output is None or output.closed:
+            output = MidiController.open_midi_port(port_name)
+            with MidiController.outputs_lock:
+               MidiController.outputs[port_name] = output
+         return output
+
+   @staticmethod
+   def close_output(port_name: str):
+      with MidiController.outputs_lock:
+         output = MidiController.outputs.pop(port_name, None)
+      if output is not None:
+         try:
+            output.close()
+            log(f"Closed port: {port_name}")
+         except Exception as e:
+            log(f"Error closing {port_name}: {e}")
+
+   @staticmethod
+   def close_all():
+      for port_name in list(MidiController.outputs):
+         MidiController.close_output(port_name)
+
+   @staticmethod
+   def send(port_name: str, message: mido.Message):
+      MidiController.send_run(port_name, (message,))
+
+   @staticmethod
+   def send_run(port_name: str, messages: tuple[mido.Message, ...]):
+      """Send messages back to back on the pooled output, reconnecting once if a send fails."""
+      try:
+         output = MidiController.get_output(port_name)
+         for message in messages:
+            output.send(message)
+      except Exception as e:
+         # the device may have been unplugged or reset; drop the connection and resend on a fresh one
+         log(f"Error sending to {port_name}: {e}; reconnecting")
+         MidiController.close_output(port_name)
+         output = MidiController.get_output(port_name)
+         for message in messages:
+            output.send(message)
+
+   @staticmethod
+   def send_batch(port: str, batch: MidiBatch):
+      """Send a batch: one output lookup per run, and a pause only where the batch has one."""
+      log.debug("Sending to", port, batch)
+      for messages, pause in batch.runs:
+         MidiController.send_run(port, messages)
+         if pause:
+            time.sleep(pause)
+
+   @staticmethod
+   @lru_cache(maxsize=256)
+   def preset_change_batch(cc: int, pgm: int, bank_select_delay: float, bank_lsb: int | None = None, controls: tuple[tuple[int, int], ...] = ()) -> MidiBatch:
+      """Bank select (CC0, and CC32 if bank_lsb is given), the pause, the program change, then any (control, value) pairs."""
+      items = [mido.Message("control_change", channel=0, control=0, value=cc)]
+      if bank_lsb is not None:
+         items.append(mido.Message("control_change", channel=0, control=32, value=bank_lsb))
+      # the synth needs this long after a bank select before the program change lands in the new bank
+      items.append(bank_select_delay)
+      items.append(mido.Message("program_change", channel=0, program=pgm))
+      items.extend(mido.Message("control_change", channel=0, control=control, value=value) for control, value in controls)
+      return MidiBatch(items)
+
    @staticmethod
    def send_preset_change(port: str, cc: int, pgm: int):
-      output = MidiController.open_midi_port(port)
+      batch = MidiController.preset_change_batch(cc, pgm, MidiTiming.get_profile(port).bank_select_delay)
+      MidiController.send_batch(port, batch)
+
+   @staticmethod
+   def request_preset_change(port: str, cc: int, pgm: int):
+      """Hand a preset change to the sender thread and return at once.
 
-      cc_msg = mido.Message("control_change", channel=0, control=0, value=cc)
-      log(f"Sending CC message: {cc_msg.hex()}")
-      output.send(cc_msg)
-      log(f"Sent CC message: {cc_msg.hex()}")
+      Requests arriving while one is being sent are coalesced: only the latest is sent next.
+      """
+      with MidiController.pending_changed:
+         MidiController.pending = (port, cc, pgm)
+         MidiController.stopping = False
+         if MidiController.sender is None or not MidiController.sender.is_alive():
+            # run in a copy of the caller's context, so log() on the sender thread still reaches the app
+            context = contextvars.copy_context()
+            MidiController.sender = threading.Thread(target=context.run, args=(MidiController.run_sender,), name="midi-sender", daemon=True)
+            MidiController.sender.start()
+         MidiController.pending_changed.notify()
 
-      time.sleep(0.4)
+   @staticmethod
+   def run_sender():
+      while True:
+         with MidiController.pending_changed:
+            while MidiController.pending is None and not MidiController.stopping:
+               MidiController.pending_changed.wait()
+            if MidiController.stopping:
+               return
+            request, MidiController.pending = MidiController.pending, None
+         try:
+            MidiController.send_preset_change(*request)
+         except Exception as e:
+            log(f"Error sending preset change {request}: {e}")
+
+   @staticmethod
+   def shutdown(timeout: float = 1.0):
+      """Stop the sender thread, dropping any unsent request, and close every output."""
+      with MidiController.pending_changed:
+         MidiController.stopping = True
+         MidiController.pending = None
+         MidiController.pending_changed.notify()
+         sender = MidiController.sender
+      if sender is not None and sender is not threading.current_thread():
+         # let a preset change that is half sent finish
+         sender.join(timeout)
+      MidiController.close_all()
 
-      pgm_msg = mido.Message("program_change", channel=0, program=pgm)
-      log(f"Sending PGM message: {pgm_msg.hex()}")
-      output.send(pgm_msg)
-      log(f"Sent PGM message: {pgm_msg.hex()}")
 
-      output.close()
+# ports left open by a crash or a plain sys.exit still get closed
+atexit.register(MidiController.shutdown)
@@ -0,0 +1,58 @@
+import contextvars
+import mido
+import threading
+from textual import log
+
+
+class MidiPortDiscovery:
+   """MIDI output port names, enumerated off the UI thread and cached.
+
+   The MIDI backend can be slow to start, can hang, and can fail on its first call, so
+   enumerate() runs it on a daemon thread and waits at most ENUMERATION_TIMEOUT. A
+   failed or timed out enumeration keeps the previous cached list and is retried on the
+   next poll.
+   """
+
+   # seconds between enumerations, to notice devices being plugged in or removed
+   POLL_INTERVAL = 2.0
+   ENUMERATION_TIMEOUT = 3.0
+   # names from the last enumeration that succeeded, None until one has
+   ports: tuple[str, ...] | None = None
+   # why the last enumeration failed, None if it succeeded
+   error: str | None = None
+   # the enumeration thread, while one is running
+   enumerating: threading.Thread | None = None
+   lock = threading.Lock()
+
+   @staticmethod
+   def enumerate(timeout: float | None = None) -> tuple[str, ...] | None:
+      """Enumerate the output ports and return them, or the cached list if that fails or times out."""
+      with MidiPortDiscovery.lock:
+         thread = MidiPortDiscovery.enumerating
+         if thread is None or not thread.is_alive():
+            # a hung enumeration is never stacked on top of another
+            # in the caller's context, so its log() calls reach the app
+            context = contextvars.copy_context()
+            thread = threading.Thread(target=context.run, args=(MidiPortDiscovery.run_enumeration,), name="midi-port-enumeration", daemon=True)
+            MidiPortDiscovery.enumerating = thread
+            thread.start()
+      thread.join(MidiPortDiscovery.ENUMERATION_TIMEOUT if timeout is None else timeout)
+      if thread.is_alive():
+         log("MIDI port enumeration timed out")
+      return MidiPortDiscovery.ports
+
+   @staticmethod
+   def run_enumeration():
+      try:
+         ports = tuple(mido.get_output_names())
+      except Exception as e:
+         log(f"Error getting MIDI ports: {e}")
+         MidiPortDiscovery.error = str(e)
+         return
+      MidiPortDiscovery.ports = ports
+      MidiPortDiscovery.error = None
+
+   @staticmethod
+   def diff(old: tuple[str, ...], new: tuple[str, ...]) -> tuple[tuple[str, ...], tuple[str, ...]]:
+      """Return the (added, removed) port names going from old to new."""
+      return tuple(port for port in new if port not in old), tuple(port for port in old if port not in new)
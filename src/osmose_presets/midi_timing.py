@@ -0,0 +1,116 @@
+import argparse
+import mido
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from osmose_presets.helper_functions import Helper
+
+
+@dataclass(frozen=True, slots=True)
+class TimingProfile:
+   """Delays, in seconds, that one MIDI port needs. Kept per port under "midi_timing" in config.json."""
+
+   # between the bank select (CC0) and the program change
+   bank_select_delay: float = 0.4
+   # between the first open/close of the port and the real open
+   reset_delay: float = 0.5
+
+
+class MidiTiming:
+   CONFIG_KEY = "midi_timing"
+   # gaps tried by calibrate(), longest first
+   CALIBRATION_GAPS = (0.4, 0.3, 0.2, 0.15, 0.1, 0.075, 0.05, 0.03, 0.02, 0.01, 0.005, 0.0)
+   # port name -> profile, read from the config once per port
+   profiles: dict[str, TimingProfile] = {}
+   profiles_lock = threading.Lock()
+
+   @staticmethod
+   def get_profile(port_name: str) -> TimingProfile:
+      """Return the timing profile of port_name, or the defaults if it has none."""
+      with MidiTiming.profiles_lock:
+         profile = MidiTiming.profiles.get(port_name)
+         if profile is None:
+            settings = Helper.get_config_value(MidiTiming.CONFIG_KEY, {}).get(port_name, {})
+            known = {f.name for f in fields(TimingProfile)}
+            profile = TimingProfile(**{name: float(value) for name, value in settings.items() if name in known})
+            MidiTiming.profiles[port_name] = profile
+         return profile
+
+   @staticmethod
+   def set_profile(port_name: str, profile: TimingProfile):
+      """Save the timing profile of port_name to the config."""
+      with MidiTiming.profiles_lock:
+         MidiTiming.profiles[port_name] = profile
+         timing = dict(Helper.get_config_value(MidiTiming.CONFIG_KEY, {}))
+         timing[port_name] = asdict(profile)
+         Helper.set_config_value(MidiTiming.CONFIG_KEY, timing)
+
+   @staticmethod
+   def calibrate(output_name: str, input_name: str, gaps=CALIBRATION_GAPS, trials: int = 5, timeout: float = 1.0, report=print) -> float | None:
+      """Return the shortest CC0 -> program change gap that came through reliably.
+
+      Bank select and program change pairs are sent to output_name with progressively
+      shorter gaps, and every pair must arrive complete and in order on input_name: a
+      loopback or virtual port wired through the device, or the device's own MIDI out
+      if it echoes changes. Calibration stops at the first gap with a failed trial.
+      Returns None if even the longest gap failed.
+      """
+      reliable = None
+      with mido.open_output(output_name) as output, mido.open_input(input_name) as input_port:
+         for gap in gaps:
+            passed = sum(MidiTiming.run_trial(output, input_port, gap, trial, timeout) for trial in range(trials))
+            report(f"gap {gap * 1000:6.1f} ms: {passed}/{trials} received")
+            if passed < trials:
+               break
+            reliable = gap
+      return reliable
+
+   @staticmethod
+   def run_trial(output, input_port, gap: float, trial: int, timeout: float) -> bool:
+      """Send one bank select / program change pair and check it comes back intact."""
+      # drop anything left over from an earlier trial
+      for _ in input_port.iter_pending():
+         pass
+      bank, program = trial % 128, (trial * 7 + 1) % 128
+      output.send(mido.Message("control_change", channel=0, control=0, value=bank))
+      time.sleep(gap)
+      output.send(mido.Message("program_change", channel=0, program=program))
+      expected = [("control_change", bank), ("program_change", program)]
+      received = []
+      deadline = time.monotonic() + timeout
+      while len(received) < len(expected) and time.monotonic() < deadline:
+         message = input_port.poll()
+         if message is None:
+            time.sleep(0.001)
+         elif message.type == "control_change" and message.control == 0:
+            received.append((message.type, message.value))
+         elif message.type == "program_change":
+            received.append((message.type, message.program))
+      return received == expected
+
+
+def main():
+   parser = argparse.ArgumentParser(description="Measure the bank select to program change gap a MIDI port needs and save it to config.json.")
+   parser.add_argument("--output", help="output port to calibrate (default: the port selected in the app)")
+   parser.add_argument("--input", required=True, help="input port the messages come back on (loopback, virtual port or device echo)")
+   parser.add_argument("--trials", type=int, default=5, help="pairs sent per gap (default: 5)")
+   parser.add_argument("--dry-run", action="store_true", help="measure only, don't save the result")
+   args = parser.parse_args()
+
+   output_name = args.output or Helper.get_config_value("selected_midi_port", "")
+   if not output_name:
+      parser.error("no --output given and no MIDI port selected in config.json")
+   gap = MidiTiming.calibrate(output_name, args.input, trials=args.trials)
+   if gap is None:
+      print(f"No reliable gap found for {output_name}; its timing profile is unchanged.")
+      return
+   print(f"Minimum reliable gap for {output_name}: {gap * 1000:.1f} ms")
+   if not args.dry_run:
+      profile = MidiTiming.get_profile(output_name)
+      MidiTiming.set_profile(output_name, TimingProfile(bank_select_delay=gap, reset_delay=profile.reset_delay))
+      Helper.flush_config()
+      print("Saved to config.json")
+
+
+if __name__ == "__main__":
+   main()
@@ -0,0 +1,92 @@
+import hashlib
+import os
+import pickle
+import sys
+from typing import Any, Callable
+
+
+# bump when the cache file layout changes; changes to the pickled classes are caught by
+# the schema fingerprint instead, see source_fingerprint
+CACHE_VERSION = 9
+
+
+def get_cache_path(json_path: str, variant: str = "") -> str:
+   """Return the path of the compiled cache that sits next to the JSON file."""
+   suffix = f".{variant}.cache" if variant else ".cache"
+   return os.path.splitext(json_path)[0] + suffix
+
+
+def file_digest(path: str) -> str:
+   with open(path, "rb") as f:
+      return hashlib.sha256(f.read()).hexdigest()
+
+
+def source_fingerprint(*objects) -> str:
+   """Digest of the source files defining objects.
+
+   A payload pickling instances of these classes is stale once any of their modules
+   changes, so the digest goes in the cache header and no version has to be bumped by hand.
+   """
+   digest = hashlib.sha256()
+   for path in sorted({sys.modules[obj.__module__].__file__ for obj in objects}):
+      with open(path, "rb") as f:
+         digest.update(f.read())
+   return digest.hexdigest()
+
+
+def read_cache(cache_path: str, schema: str = "") -> tuple[tuple, Any] | None:
+   """Return (header, payload) from a cache file, or None if it is missing or unreadable.
+
+   The header is pickled separately in front of the payload, so a stale cache can be
+   rejected without unpickling the presets.
+   """
+   try:
+      with open(cache_path, "rb") as f:
+         header = pickle.load(f)
+         if not isinstance(header, tuple) or len(header) != 5 or header[:2] != (CACHE_VERSION, schema):
+            return None
+         return header, pickle.load(f)
+   except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+      return None
+
+
+def write_cache(cache_path: str, header: tuple, payload: Any) -> None:
+   """Write the cache through a temp file so a crash never leaves a half written cache."""
+   temp_path = f"{cache_path}.{os.getpid()}.tmp"
+   try:
+      with open(temp_path, "wb") as f:
+         pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+         pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+      os.replace(temp_path, cache_path)
+   except OSError:
+      # a read-only install just runs without a cache
+      try:
+         os.remove(temp_path)
+      except OSError:
+         pass
+
+
+def load_cached(json_path: str, build: Callable[[str], Any], variant: str = "", schema: str = "") -> Any:
+   """Return build(json_path), reusing the compiled cache while the JSON is unchanged.
+
+   The cache is keyed by the JSON's mtime and size; if those differ (a fresh checkout,
+   a touched file) the SHA-256 of the JSON decides whether the cache is still valid.
+   Different kinds of payload built from the same JSON are told apart by variant, and a
+   cache written for another schema (see source_fingerprint) is rebuilt.
+   """
+   stat = os.stat(json_path)
+   cache_path = get_cache_path(json_path, variant)
+   cached = read_cache(cache_path, schema)
+   if cached is not None:
+      (_, _, mtime_ns, size, digest), payload = cached
+      if (mtime_ns, size) == (stat.st_mtime_ns, stat.st_size):
+         return payload
+      current_digest = file_digest(json_path)
+      if digest == current_digest:
+         write_cache(cache_path, (CACHE_VERSION, schema, stat.st_mtime_ns, stat.st_size, digest), payload)
+         return payload
+   else:
+      current_digest = file_digest(json_path)
+   payload = build(json_path)
+   write_cache(cache_path, (CACHE_VERSION, schema, stat.st_mtime_ns, stat.st_size, current_digest), payload)
+   return payload
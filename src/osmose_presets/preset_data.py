@@ -1,205 +1,519 @@
 from textual import log
+from textual.cache import LRUCache
 import json
 import os
-from dataclasses import dataclass, field, fields
-from typing import List
+import threading
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, fields
+from sys import intern
+from typing import Callable, List, Sequence
+from osmose_presets.columnar_store import ColumnarStore
+from osmose_presets.filters import FilterState
+from osmose_presets.preset_cache import load_cached, source_fingerprint
+from osmose_presets.preset_stats import PresetStats
+from osmose_presets.preset_index import FuzzyIndex, PresetIndex, TrigramIndex, bits_from_indices, indices_from_bits
+from osmose_presets.search_query import Fuzzy, compile_query, evaluate_search, make_haystack, narrows
 
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PRESET_DATA = os.path.join(SCRIPT_DIR, "OsmosePresets.json")
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Preset:
+   """One preset. Slotted and immutable; pack, type and chars hold interned strings."""
+
    pack: str
    type: str
    cc0: int
    pgm: int
    preset: str
-   chars: List[str] = field(default_factory=list)
+   chars: tuple[str, ...] = ()
 
    def get_field_widths(self) -> list[int]:
-      result = []
-      for f in fields(self):
-         value = getattr(self, f.name)
-         if isinstance(value, int):
-            result.append(len(str(value)))
-         elif isinstance(value, list):
-            result.append(len(", ".join(str(item) for item in value)))
+      """Display width of each field, in field order."""
+      return [len(self.pack), len(self.type), len(str(self.cc0)), len(str(self.pgm)), len(self.preset), len(", ".join(self.chars))]
+
+   def get_id(self) -> tuple[int, int, str]:
+      """Stable identity of the preset: its bank, program and pack."""
+      return (self.cc0, self.pgm, self.pack)
+
+   def get_haystack(self) -> str:
+      """All fields as one lowercased string, for unqualified search terms."""
+      return make_haystack(self.pack, self.type, self.cc0, self.pgm, self.preset, self.chars)
+
+
+class PresetRows(Sequence):
+   """A filter result seen as display row tuples, converted only when a row is read.
+
+   This is the row source handed to AlignedDataTable.set_row_source, so only the rows
+   on screen are ever turned into tuples. The result is held as the sorted store rows
+   of the matching presets, so a new result can be applied as a diff by update(). A
+   ranked result (a fuzzy search) comes with its rows already in order, see
+   PresetData.get_ranking, and is replaced whole on every update.
+   """
+
+   # each patched row shifts the rest of the array, so past this many changes a rebuild is cheaper
+   MAX_PATCHED_ROWS = 256
+
+   def __init__(self, store: "PresetStore", bits: int = 0, ranking: Sequence[int] | None = None) -> None:
+      # ranking, when given, lists the rows of bits in the order to show them
+      self.store = store
+      self.generation = store.generation
+      # rows sync() dropped since the last update(), which reports them as changed
+      self.removed = 0
+      self.set_rows(bits, ranking)
+
+   def set_rows(self, bits: int, ranking: Sequence[int] | None) -> None:
+      self.bits = bits
+      self.ranking = ranking
+      self.rows = array("I", indices_from_bits(bits) if ranking is None else ranking)
+
+   def sync(self) -> None:
+      """Renumber the rows after removals from the store, so each row still shows its own preset."""
+      store = self.store
+      if self.generation == store.generation:
+         return
+      rows = self.rows
+      count = len(rows)
+      for removed in store.removed_rows[self.generation :]:
+         rows = array("I", [row - (row > removed) for row in rows if row != removed])
+      self.generation = store.generation
+      self.rows = rows
+      self.bits = bits_from_indices(rows, len(store.presets))
+      if self.ranking is not None:
+         self.ranking = rows.tolist()
+      self.removed += count - len(rows)
+
+   def __len__(self) -> int:
+      self.sync()
+      return len(self.rows)
+
+   def __getitem__(self, index):
+      if isinstance(index, slice):
+         return [self[i] for i in range(*index.indices(len(self)))]
+      return PresetData.preset_to_tuple(self.preset_at(index))
+
+   def preset_at(self, index: int) -> Preset:
+      self.sync()
+      return self.store.presets[self.rows[index]]
+
+   def index_of(self, preset_id: tuple) -> int | None:
+      """Position of the preset with preset_id in this result, or None if it is not in it."""
+      self.sync()
+      row = self.store.find_row(preset_id)
+      if row is None:
+         return None
+      if self.ranking is not None:
+         return self.rows.index(row) if row in self.rows else None
+      index = bisect_left(self.rows, row)
+      if index < len(self.rows) and self.rows[index] == row:
+         return index
+      return None
+
+   def update(self, bits: int, ranking: Sequence[int] | None = None) -> int:
+      """Replace the result with bits, inserting and removing only the rows that changed.
+
+      Returns the number of rows that changed.
+      """
+      # a removal renumbered the store rows; catch up first so the old result can be diffed
+      self.sync()
+      removed, self.removed = self.removed, 0
+      if ranking is not None or self.ranking is not None:
+         if bits == self.bits and ranking == self.ranking:
+            return removed
+         changed = (self.bits ^ bits).bit_count()
+         self.set_rows(bits, ranking)
+         return changed or len(self.rows)
+      changed = indices_from_bits(self.bits ^ bits)
+      self.bits = bits
+      if len(changed) > self.MAX_PATCHED_ROWS:
+         self.rows = array("I", indices_from_bits(bits))
+         return len(changed)
+      rows = self.rows
+      for row in changed:
+         index = bisect_left(rows, row)
+         if index < len(rows) and rows[index] == row:
+            del rows[index]
          else:
-            result.append(len(value))
-      return result
+            rows.insert(index, row)
+      return len(changed) + removed
+
+
+class PresetStore:
+   """A loaded preset library: the presets plus the indexes built over them.
+
+   With the "index" backend presets is a list of Preset objects filtered through a
+   PresetIndex. With the "columnar" backend the data lives in a ColumnarStore and presets
+   is a view that builds each Preset on access. Both index types expose the same match().
+   The search runs on haystacks, each preset's fields lowercased into one string, with a
+   trigram index over them. The stats (vocabularies, counts, column widths) are computed
+   in the same pass and, like the indexes, kept current by add_preset() and remove_preset().
+   """
+
+   BACKENDS = ("index", "columnar")
+
+   def __init__(self, presets: Sequence[Preset], index: PresetIndex | ColumnarStore, haystacks: list[str], trigrams: TrigramIndex, stats: PresetStats) -> None:
+      self.presets = presets
+      self.index = index
+      self.haystacks = haystacks
+      self.trigrams = trigrams
+      self.stats = stats
+      # bumped when store rows are renumbered, and the row removed by each bump; see PresetRows.sync
+      self.generation = 0
+      self.removed_rows: list[int] = []
+      # preset id -> store row, built on first use by find_row
+      self.id_rows: dict[tuple, int] | None = None
+      # built on the first fuzzy search, see get_fuzzy_index
+      self.fuzzy_index: FuzzyIndex | None = None
+
+   @property
+   def backend(self) -> str:
+      return "columnar" if isinstance(self.index, ColumnarStore) else "index"
+
+   def add_preset(self, preset: Preset) -> None:
+      row = len(self.presets)
+      if isinstance(self.index, ColumnarStore):
+         # the column view grows with the columns
+         self.index.append(preset)
+      else:
+         self.presets.append(preset)
+         self.index.add(row, preset)
+      haystack = preset.get_haystack()
+      self.haystacks.append(haystack)
+      self.trigrams.add(row, haystack)
+      self.stats.add(preset)
+      if self.id_rows is not None:
+         self.id_rows.setdefault(preset.get_id(), row)
+      self.fuzzy_index = None
+
+   def remove_preset(self, preset: Preset) -> None:
+      presets = list(self.presets)
+      row = presets.index(preset)
+      del presets[row]
+      # every later row shifts down one, so the indexes are rebuilt; the stats are not
+      rebuilt = PresetStore.build(presets, self.backend, self.stats)
+      self.presets, self.index, self.haystacks, self.trigrams = rebuilt.presets, rebuilt.index, rebuilt.haystacks, rebuilt.trigrams
+      self.stats.remove(preset)
+      self.removed_rows.append(row)
+      self.generation += 1
+      self.id_rows = None
+      self.fuzzy_index = None
+
+   def find_row(self, preset_id: tuple) -> int | None:
+      """Store row of the preset with preset_id, or None if there is none."""
+      if self.id_rows is None:
+         id_rows = {}
+         for row, preset in enumerate(self.presets):
+            id_rows.setdefault(preset.get_id(), row)
+         self.id_rows = id_rows
+      return self.id_rows.get(preset_id)
+
+   def get_fuzzy_index(self) -> FuzzyIndex:
+      if self.fuzzy_index is None:
+         self.fuzzy_index = FuzzyIndex(self.haystacks)
+      return self.fuzzy_index
+
+   @staticmethod
+   def build(presets: List[Preset], backend: str = "index", stats: PresetStats | None = None) -> "PresetStore":
+      if backend not in PresetStore.BACKENDS:
+         raise ValueError(f"unknown preset backend {backend!r}, expected one of {PresetStore.BACKENDS}")
+      haystacks = [preset.get_haystack() for preset in presets]
+      trigrams = TrigramIndex(haystacks)
+      if stats is None:
+         stats = PresetStats(presets)
+      if backend == "columnar":
+         columns = ColumnarStore(presets, Preset)
+         return PresetStore(columns.view(), columns, haystacks, trigrams, stats)
+      return PresetStore(presets, PresetIndex(presets), haystacks, trigrams, stats)
+
+   @staticmethod
+   def from_json(file_path: str, backend: str = "index") -> "PresetStore":
+      """Load a store through the compiled cache, parsing the JSON only when it has changed."""
+      # everything the store pickles, and make_haystack, whose output is cached
+      schema = source_fingerprint(PresetStore, PresetIndex, PresetStats, ColumnarStore, make_haystack)
+      return load_cached(file_path, lambda path: PresetStore.build(PresetData.load_from_json(path), backend), variant=backend, schema=schema)
 
 
 class PresetData:
-   cached_presets = []
-   pack_filters = []
-   type_filters = []
-   char_filters = []
-   search_term = ""
+   # nothing is read until the first call that needs presets, see load()
+   data_file = PRESET_DATA
+   backend = "index"
+   store: PresetStore | None = None
+   load_lock = threading.Lock()
+   # (query, bitset of every preset it matches), shared by query() and the facet counts
+   search_result = (None, 0)
+   # (fuzzy query, its ranked store rows, their bitset)
+   fuzzy_result = (None, [], 0)
+   # result bitsets of recent filter combinations, see query
+   RESULT_CACHE_SIZE = 32
+   result_cache: LRUCache[tuple, int] = LRUCache(RESULT_CACHE_SIZE)
+   # the search worker and the UI thread both read and fill the caches above
+   result_cache_lock = threading.Lock()
+   # bumped by clear_results; a result computed before the bump belongs to the old presets
+   # and is returned to its caller but never cached, see cache_result
+   results_version = 0
+   # called with no arguments, on the thread that made the change, after presets are added or removed
+   change_listeners: list[Callable[[], None]] = []
+   # nothing below keeps filter state of its own: every query gets a FilterState, and the
+   # cached results above are only replaced whole, so views on other threads can share them
 
    @staticmethod
    def load_from_json(file_path: str) -> List[Preset]:
       loaded_presets = []
+      # many presets share the same combination of chars, so share the tuples as well
+      char_tuples = {}
       with open(file_path, "r", encoding="utf-8") as f:
          data = json.load(f)
 
          for preset_dict in data:
+            chars = tuple(intern(char) for char in preset_dict.get("chars", []))
             preset = Preset(
-               pack=preset_dict.get("pack"),
-               type=preset_dict.get("type"),
+               pack=intern(preset_dict.get("pack")),
+               type=intern(preset_dict.get("type")),
                cc0=preset_dict.get("cc0"),
                pgm=preset_dict.get("pgm"),
                preset=preset_dict.get("preset"),
-               chars=preset_dict.get("chars", []),
+               chars=char_tuples.setdefault(chars, chars),
             )
             loaded_presets.append(preset)
       return loaded_presets
 
+   @staticmethod
+   def load() -> PresetStore:
+      """Return the preset store, loading data_file on first use.
+
+      Safe to call from a worker thread: concurrent callers wait for the one load.
+      """
+      store = PresetData.store
+      if store is None:
+         with PresetData.load_lock:
+            if PresetData.store is None:
+               PresetData.set_store(PresetStore.from_json(PresetData.data_file, PresetData.backend))
+            store = PresetData.store
+      return store
+
+   @staticmethod
+   def is_loaded() -> bool:
+      return PresetData.store is not None
+
+   @staticmethod
+   def set_store(store: PresetStore | None):
+      PresetData.store = store
+      PresetData.clear_results()
+
+   @staticmethod
+   def clear_results():
+      """Forget every result computed so far; called whenever the presets change."""
+      with PresetData.result_cache_lock:
+         PresetData.results_version += 1
+         PresetData.search_result = (None, 0)
+         PresetData.fuzzy_result = (None, [], 0)
+         PresetData.result_cache.clear()
+
+   @staticmethod
+   def cache_result(version: int, name: str, value) -> None:
+      """Set the cached result name to value, unless the presets changed since version was read."""
+      with PresetData.result_cache_lock:
+         if version == PresetData.results_version:
+            setattr(PresetData, name, value)
+
+   @staticmethod
+   def set_result_cache_size(size: int):
+      """Keep the results of the size most recently used filter combinations."""
+      if size < 1:
+         raise ValueError(f"filter cache size must be at least 1, got {size}")
+      with PresetData.result_cache_lock:
+         PresetData.result_cache = LRUCache(size)
+
+   @staticmethod
+   def get_result_cache_stats() -> dict[str, int]:
+      """Hits, misses, entries and capacity of the filter result cache."""
+      cache = PresetData.result_cache
+      return {"hits": cache.hits, "misses": cache.misses, "size": len(cache), "maxsize": cache.maxsize}
+
+   @staticmethod
+   def set_presets(presets: List[Preset]):
+      PresetData.set_store(PresetStore.build(presets, PresetData.backend))
+
+   @staticmethod
+   def use_data_file(file_path: str):
+      """Point PresetData at another JSON file (e.g. a test fixture); it loads lazily."""
+      PresetData.data_file = file_path
+      PresetData.set_store(None)
+
+   @staticmethod
+   def use_backend(backend: str):
+      """Switch between the "index" and "columnar" storage backends; reloads lazily."""
+      if backend not in PresetStore.BACKENDS:
+         raise ValueError(f"unknown preset backend {backend!r}, expected one of {PresetStore.BACKENDS}")
+      PresetData.backend = backend
+      PresetData.set_store(None)
+
    @staticmethod
    def evaluate_search(search_term, target_string):
-      # Split the search term by " OR " to handle the lowest precedence operator.
-      or_clauses = [clause.strip() for clause in search_term.split(" OR ")]
-      # Evaluate each "AND" clause independently.
-      # Using a generator expression for efficiency.
-      and_results = (all(term.strip() in target_string for term in clause.split(" AND ")) for clause in or_clauses)
+      return evaluate_search(search_term, target_string)
 
-      # Step 3: The final result is TRUE if any of the "AND" clauses were a match.
-      return any(and_results)
+   @staticmethod
+   def get_presets(state: FilterState):
+      presets = PresetData.load().presets
+      return [presets[i] for i in indices_from_bits(PresetData.query(state))]
 
    @staticmethod
-   def get_presets():
-      result = []
-      # only apply filters if both filters are active
-      if not PresetData.pack_filters or not PresetData.type_filters or not PresetData.char_filters:
-         return result
-      # build filtered list from cached list
-      for preset in PresetData.cached_presets:
-         pack_ok = not PresetData.pack_filters or preset.pack in PresetData.pack_filters
-         type_ok = not PresetData.type_filters or preset.type in PresetData.type_filters
-         char_ok = not PresetData.char_filters or set(preset.chars) & set(PresetData.char_filters)
-         # search_ok = not PresetData.search_term or PresetData.search_term in preset.preset
-         search_ok = not PresetData.search_term or PresetData.evaluate_search(PresetData.search_term, preset.preset)
-
-         if pack_ok and type_ok and char_ok and search_ok:
-            result.append(preset)
+   def query(state: FilterState) -> int:
+      """Return the bitset of store rows that pass the filters and the search of state.
+
+      The search part is the cached get_search_bits result, so the facet counts and the
+      rows share one scan per search. Results are kept in an LRU cache keyed by the
+      selected values and the query's structure, so going back to a recent combination
+      costs a lookup.
+      """
+      if not state.selects_anything():
+         return 0
+      # read before the store, so a store replaced meanwhile is noticed
+      version = PresetData.results_version
+      # the query is parsed once per search string, not once per preset
+      store = PresetData.load()
+      query = compile_query(state.search_term)
+      cache_key = (state.packs, state.types, state.chars, repr(query))
+      with PresetData.result_cache_lock:
+         bits = PresetData.result_cache.get(cache_key)
+      if bits is not None:
+         return bits
+      # intersect the posting lists, then the presets matching the search
+      bits = store.index.match(state.packs, state.types, state.chars)
+      if query is not None:
+         bits &= PresetData.search_bits(store, query, version)
+      with PresetData.result_cache_lock:
+         if version == PresetData.results_version:
+            PresetData.result_cache.set(cache_key, bits)
+      return bits
 
-      return result
+   @staticmethod
+   def get_search_bits(search_term: str) -> int:
+      """Return the bitset of all presets matching search_term, whatever the filters."""
+      version = PresetData.results_version
+      store = PresetData.load()
+      query = compile_query(search_term)
+      if query is None:
+         return (1 << len(store.presets)) - 1
+      return PresetData.search_bits(store, query, version)
 
    @staticmethod
-   def preset_to_tuple(preset: Preset) -> tuple:
-      return tuple(", ".join(value) if isinstance(value, list) else value for f in fields(preset) for value in [getattr(preset, f.name)])
+   def search_bits(store: PresetStore, query, version: int) -> int:
+      """The bitset of the store rows matching the compiled query, remembered for the next call."""
+      if isinstance(query, Fuzzy):
+         return PresetData.get_fuzzy_result(query)[1]
+      last_query, bits = PresetData.search_result
+      if query is not last_query:
+         candidates = query.candidates(store.trigrams)
+         if last_query is not None and narrows(query, last_query):
+            # the user only narrowed the previous search, so refine its result instead of rescanning
+            candidates &= bits
+         presets = store.presets
+         haystacks = store.haystacks
+         rows = [i for i in indices_from_bits(candidates) if query.matches(haystacks[i], presets, i)]
+         bits = bits_from_indices(rows, len(presets))
+         PresetData.cache_result(version, "search_result", (query, bits))
+      return bits
 
    @staticmethod
-   def flatten_presets_to_tuples(preset_list: List[Preset]) -> List[tuple]:
-      return [PresetData.preset_to_tuple(preset) for preset in preset_list]
+   def get_fuzzy_result(query: Fuzzy) -> tuple[list[int], int]:
+      """The ranked store rows matching a fuzzy query, and their bitset."""
+      version = PresetData.results_version
+      last_query, ranking, bits = PresetData.fuzzy_result
+      if query is not last_query:
+         store = PresetData.load()
+         ranking = store.get_fuzzy_index().search(query.terms)
+         bits = bits_from_indices(ranking, len(store.presets))
+         PresetData.cache_result(version, "fuzzy_result", (query, ranking, bits))
+      return ranking, bits
 
    @staticmethod
-   def get_presets_as_tuples():
-      return PresetData.flatten_presets_to_tuples(PresetData.get_presets())
+   def get_ranking(state: FilterState, bits: int) -> list[int] | None:
+      """The rows of bits, the result of state, best match first for a fuzzy search; None otherwise."""
+      query = compile_query(state.search_term)
+      if not isinstance(query, Fuzzy):
+         return None
+      ranking, fuzzy_bits = PresetData.get_fuzzy_result(query)
+      if bits == fuzzy_bits:
+         # no filter is hiding any match
+         return ranking
+      shown = set(indices_from_bits(bits))
+      return [row for row in ranking if row in shown]
 
    @staticmethod
-   def get_all_presets():
-      return PresetData.cached_presets
+   def get_facet_counts(state: FilterState) -> dict[str, dict[str, int]]:
+      """Presets per pack, type and char value that the search and the other two filters let through.
+
+      Computed for all three filters at once from the index, so it is cheap enough to
+      redo after every filter toggle.
+      """
+      store = PresetData.load()
+      return store.index.facet_counts(state.packs, state.types, state.chars, PresetData.get_search_bits(state.search_term))
 
    @staticmethod
-   def get_preset_max_widths() -> list[int]:
-      if not PresetData.cached_presets:
-         return []
-      num_fields = len(PresetData.cached_presets[0].get_field_widths())
-      result = [0] * num_fields
-      for preset in PresetData.cached_presets:
-         widths = preset.get_field_widths()
-         for i, width in enumerate(widths):
-            if width > result[i]:
-               result[i] = width
-      return result
+   def preset_to_tuple(preset: Preset) -> tuple:
+      return tuple(", ".join(value) if isinstance(value, tuple) else value for f in fields(preset) for value in [getattr(preset, f.name)])
 
    @staticmethod
-   def get_chars() -> list[str]:
-      result = []
-      if not PresetData.cached_presets:
-         return result
-      unassigned_found = False
-      for preset in PresetData.cached_presets:
-         for char in preset.chars:
-            if char not in result:
-               if char != "UNASSIGNED":
-                  result.append(char)
-            if char == "UNASSIGNED":
-               unassigned_found = True
-      result.sort()
-      if unassigned_found:
-         result.append("UNASSIGNED")
-      return result
+   def flatten_presets_to_tuples(preset_list: List[Preset]) -> List[tuple]:
+      return [PresetData.preset_to_tuple(preset) for preset in preset_list]
 
    @staticmethod
-   def set_search_filter(search_term):
-      PresetData.search_term = search_term
+   def get_presets_as_tuples(state: FilterState):
+      return PresetData.flatten_presets_to_tuples(PresetData.get_presets(state))
 
    @staticmethod
-   def get_all_preset_names():
-      result = []
-      for preset in PresetData.cached_presets:
-         result.append(preset.preset)
-      return result
+   def get_presets_as_rows(state: FilterState) -> PresetRows:
+      bits = PresetData.query(state)
+      return PresetRows(PresetData.load(), bits, PresetData.get_ranking(state, bits))
 
    @staticmethod
-   def clear_pack_filters():
-      PresetData.pack_filters.clear()
+   def get_all_presets():
+      return PresetData.load().presets
 
    @staticmethod
-   def add_pack_filter(pack_filter):
-      if isinstance(pack_filter, str):
-         PresetData.pack_filters.append(pack_filter)
-      elif isinstance(pack_filter, list):
-         PresetData.pack_filters.extend(pack_filter)
-      else:
-         raise TypeError("pack_filter must be a string or a list of strings")
+   def get_stats() -> PresetStats:
+      return PresetData.load().stats
 
    @staticmethod
-   def clear_type_filters():
-      PresetData.type_filters.clear()
+   def add_preset(preset: Preset):
+      PresetData.load().add_preset(preset)
+      PresetData.clear_results()
+      PresetData.notify_change()
 
    @staticmethod
-   def add_type_filter(type_filter):
-      if isinstance(type_filter, str):
-         PresetData.type_filters.append(type_filter)
-      elif isinstance(type_filter, list):
-         PresetData.type_filters.extend(type_filter)
-      else:
-         raise TypeError("type_filter must be a string or a list of strings")
+   def remove_preset(preset: Preset):
+      PresetData.load().remove_preset(preset)
+      PresetData.clear_results()
+      PresetData.notify_change()
 
    @staticmethod
-   def clear_char_filters():
-      PresetData.char_filters.clear()
+   def notify_change():
+      for listener in list(PresetData.change_listeners):
+         listener()
 
    @staticmethod
-   def add_char_filter(char_filter):
-      if isinstance(char_filter, str):
-         PresetData.char_filters.append(char_filter)
-      elif isinstance(char_filter, list):
-         PresetData.char_filters.extend(char_filter)
-      else:
-         raise TypeError("char_filter must be a string or a list of strings")
+   def get_preset_max_widths() -> list[int]:
+      return PresetData.get_stats().get_max_widths()
 
    @staticmethod
-   def get_packs():
-      packs = []
-      for preset in PresetData.cached_presets:
-         if preset.pack not in packs:
-            packs.append(preset.pack)
-      return packs
+   def get_chars() -> list[str]:
+      return PresetData.get_stats().get_chars()
 
    @staticmethod
-   def get_types(pack=""):
-      types = []
-      for preset in PresetData.cached_presets:
-         if (pack and preset.pack == pack) or not pack:
-            if preset.type not in types:
-               types.append(preset.type)
-      return types
+   def get_all_preset_names():
+      result = []
+      for preset in PresetData.get_all_presets():
+         result.append(preset.preset)
+      return result
 
+   @staticmethod
+   def get_packs():
+      return PresetData.get_stats().get_packs()
 
-if not PresetData.cached_presets:
-   PresetData.cached_presets = PresetData.load_from_json(PRESET_DATA)
+   @staticmethod
+   def get_types(pack=""):
+      return PresetData.get_stats().get_types(pack)
@@ -2,21 +2,57 @@ from textual.app import ComposeResult
 from textual.containers import Vertical
 from textual import log
 from textual import events
+from textual import work
 from textual.events import Key
 from dataclasses import fields
 from osmose_presets.aligned_data_table import AlignedDataTable
-from osmose_presets.preset_data import PresetData, Preset
-from osmose_presets.messages import PresetSelected
+from osmose_presets.filters import FilterState
+from osmose_presets.preset_data import PresetData, Preset, PresetRows
+from osmose_presets.messages import PresetSelected, PresetsChanged, FacetCountsChanged
 from osmose_presets.header_panel import HeaderPanel
+from osmose_presets.search_query import FUZZY_PREFIX
 
 
 class PresetGrid(Vertical):
+   # what this grid shows; replaced, never changed in place, on every filter or search change
+   state = FilterState()
+   # bumped with every new state; a result computed for an older generation is never shown
+   generation = 0
+   # True while an evaluate worker runs; see request_evaluation
+   evaluating = False
+   # the rows currently shown, updated in place as the filters change
+   rows: PresetRows | None = None
+   # filter recomputes done so far; a burst of filter changes adds one (see schedule_filter_refresh)
+   filter_refresh_count = 0
+   filter_refresh_pending = False
+
    def on_mount(self) -> None:
       self.table = self.query_one(AlignedDataTable)
       self.table.zebra_stripes = True
       self.table.cursor_type = "row"
       self.table.show_cursor = True
       self.table.cursor_blink = False
+      if PresetData.is_loaded():
+         self.add_columns()
+      PresetData.change_listeners.append(self.notify_presets_changed)
+
+   def on_unmount(self) -> None:
+      PresetData.change_listeners.remove(self.notify_presets_changed)
+
+   def notify_presets_changed(self) -> None:
+      # PresetData calls this on whichever thread changed the presets; post_message is thread safe
+      self.post_message(PresetsChanged())
+
+   def on_presets_changed(self, message: PresetsChanged) -> None:
+      """Re-run the current state on the changed presets, so added ones appear and removed ones leave."""
+      message.stop()
+      self.set_state(self.state)
+      self.request_evaluation()
+
+   def add_columns(self) -> None:
+      """Add the preset columns; their widths need the loaded preset library."""
+      if self.table.columns:
+         return
       widths = PresetData.get_preset_max_widths()
       for i, f in enumerate(fields(Preset)):
          width = widths[i] if i < len(widths) else None
@@ -25,6 +61,7 @@ class PresetGrid(Vertical):
             name,
             justify="left" if f.type not in [int, float] else "right",
             width=width,
+            markup=False,
          )
 
    def compose(self) -> ComposeResult:
@@ -32,25 +69,101 @@ class PresetGrid(Vertical):
       yield AlignedDataTable()
 
    def set_filter(self, filter_type: str, selected_filters: list[str]):
-      self.table.clear(columns=False)
-      match filter_type:
-         case "pack":
-            PresetData.clear_pack_filters()
-            PresetData.add_pack_filter(selected_filters)
-         case "type":
-            PresetData.clear_type_filters()
-            PresetData.add_type_filter(selected_filters)
-         case "char":
-            PresetData.clear_char_filters()
-            PresetData.add_char_filter(selected_filters)
-         case _:
-            log("set_filter case not matched")
-      self.table.add_rows(PresetData.get_presets_as_tuples())
+      try:
+         state = self.state.with_filter(filter_type, selected_filters)
+      except ValueError as e:
+         log(f"set_filter: {e}")
+         return
+      self.set_state(state)
+      self.schedule_filter_refresh()
+
+   def set_state(self, state: FilterState) -> None:
+      self.state = state
+      self.generation += 1
+
+   def schedule_filter_refresh(self) -> None:
+      """Recompute the result once, after every filter change already queued has been handled.
+
+      The three selectors populating at startup, or several checkboxes changing together,
+      then cost one recompute and one grid refresh instead of one each.
+      """
+      if not self.filter_refresh_pending:
+         self.filter_refresh_pending = True
+         self.call_after_refresh(self.refresh_filters)
+
+   def refresh_filters(self) -> None:
+      self.filter_refresh_pending = False
+      self.filter_refresh_count += 1
+      self.request_evaluation()
 
    def set_search_filter(self, search_term: str):
-      PresetData.set_search_filter(search_term)
-      self.table.clear(columns=False)
-      self.table.add_rows(PresetData.get_presets_as_tuples())
+      # the search box already debounces typing, so there is nothing to coalesce here
+      self.set_state(self.state.with_search(search_term))
+      self.request_evaluation()
+
+   def request_evaluation(self) -> None:
+      """Compute the current state off the event loop, so the UI keeps drawing and taking keys.
+
+      Only one evaluation runs at a time: a Python computation can't be interrupted, and
+      superseded ones left running would starve the UI thread. A change made meanwhile is
+      picked up by finish_evaluation.
+      """
+      if not self.evaluating:
+         self.evaluating = True
+         self.evaluate(self.state, self.generation)
+
+   @work(thread=True, group="query")
+   def evaluate(self, state: FilterState, generation: int) -> None:
+      result = self.compute_result(state, generation)
+      self.app.call_from_thread(self.finish_evaluation, generation, result)
+
+   def compute_result(self, state: FilterState, generation: int) -> tuple | None:
+      """The result bits, ranking and facet counts of state, or None once a newer state makes them pointless."""
+      if state.search_term.lstrip().startswith(FUZZY_PREFIX):
+         # build the fuzzy index as soon as the prefix is typed, not on the first real term
+         PresetData.load().get_fuzzy_index()
+      bits = PresetData.query(state)
+      if generation != self.generation:
+         return None
+      ranking = PresetData.get_ranking(state, bits)
+      if generation != self.generation:
+         return None
+      return bits, ranking, PresetData.get_facet_counts(state)
+
+   def finish_evaluation(self, generation: int, result: tuple | None) -> None:
+      self.evaluating = False
+      if generation != self.generation:
+         # the state moved on while this one was computed; only the newest is worth showing
+         self.request_evaluation()
+         return
+      bits, ranking, counts = result
+      self.show_presets(bits, ranking)
+      self.post_message(FacetCountsChanged(counts))
+
+   def show_presets(self, bits: int, ranking: list[int] | None = None) -> None:
+      """Show the result bitset, changing only the rows that differ from the current result.
+
+      A fuzzy search also passes the rows of bits in ranked order, and they are shown so.
+      The cursor stays on the preset it was on, as long as that preset is still shown.
+      """
+      store = PresetData.load()
+      cursor_id = self.get_cursor_preset_id()
+      if self.rows is None or self.rows.store is not store:
+         self.rows = PresetRows(store, bits, ranking)
+         self.table.set_row_source(self.rows)
+      elif self.rows.update(bits, ranking):
+         self.table.refresh_row_source()
+      else:
+         return
+      if cursor_id is not None:
+         index = self.rows.index_of(cursor_id)
+         if index is not None:
+            self.table.move_cursor(row=index)
+
+   def get_cursor_preset_id(self) -> tuple | None:
+      if self.rows is None or not 0 <= self.table.cursor_row < len(self.rows):
+         return None
+      return self.rows.preset_at(self.table.cursor_row).get_id()
 
    def on_aligned_data_table_clicked(self, event: events.Event) -> None:
       self.app.remove_all_focused_border_titles()
@@ -0,0 +1,210 @@
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Iterable
+from osmose_presets.search_query import fuzzy_cost, max_edits, split_words
+
+
+def bits_from_indices(indices: Iterable[int], size: int) -> int:
+   """Pack row indices into an int bitset where bit i is set when row i is present."""
+   buffer = bytearray((size + 7) >> 3)
+   for i in indices:
+      buffer[i >> 3] |= 1 << (i & 7)
+   return int.from_bytes(buffer, "little")
+
+
+def indices_from_bits(bits: int) -> list[int]:
+   """Unpack an int bitset into an ascending list of row indices."""
+   result = []
+   # bin() runs in C, so scanning its reversed digits is much cheaper than shifting a big int
+   digits = bin(bits)[:1:-1]
+   i = digits.find("1")
+   while i != -1:
+      result.append(i)
+      i = digits.find("1", i + 1)
+   return result
+
+
+class PresetIndex:
+   """Inverted index over a list of presets.
+
+   Every pack, type and char value maps to a posting list stored as an int bitset,
+   so filtering is a handful of big-int OR/AND operations instead of a scan.
+   """
+
+   def __init__(self, presets: list) -> None:
+      self.size = len(presets)
+      self.all_bits = (1 << self.size) - 1
+      packs = defaultdict(list)
+      types = defaultdict(list)
+      chars = defaultdict(list)
+      for i, preset in enumerate(presets):
+         packs[preset.pack].append(i)
+         types[preset.type].append(i)
+         for char in preset.chars:
+            chars[char].append(i)
+      self.packs = {pack: bits_from_indices(rows, self.size) for pack, rows in packs.items()}
+      self.types = {type_: bits_from_indices(rows, self.size) for type_, rows in types.items()}
+      self.chars = {char: bits_from_indices(rows, self.size) for char, rows in chars.items()}
+
+   def add(self, row: int, preset) -> None:
+      """Index one more preset, appended at the end of the list as row."""
+      bit = 1 << row
+      self.size = max(self.size, row + 1)
+      self.all_bits = (1 << self.size) - 1
+      self.packs[preset.pack] = self.packs.get(preset.pack, 0) | bit
+      self.types[preset.type] = self.types.get(preset.type, 0) | bit
+      for char in preset.chars:
+         self.chars[char] = self.chars.get(char, 0) | bit
+
+   @staticmethod
+   def union(postings: dict[str, int], keys: Iterable[str]) -> int:
+      bits = 0
+      for key in keys:
+         bits |= postings.get(key, 0)
+      return bits
+
+   def match(self, packs: Iterable[str], types: Iterable[str], chars: Iterable[str]) -> int:
+      """Return the bitset of presets whose pack, type and any char are all selected."""
+      return self.union(self.packs, packs) & self.union(self.types, types) & self.union(self.chars, chars)
+
+   def facet_counts(self, packs: Iterable[str], types: Iterable[str], chars: Iterable[str], within: int) -> dict[str, dict[str, int]]:
+      """Count, per pack, type and char value, the presets in within that the other two filters select.
+
+      One AND and popcount per value, on top of one union per filter.
+      """
+      selected_packs = self.union(self.packs, packs) & within
+      selected_types = self.union(self.types, types)
+      selected_chars = self.union(self.chars, chars)
+      return {
+         "pack": count_postings(self.packs, within & selected_types & selected_chars),
+         "type": count_postings(self.types, selected_packs & selected_chars),
+         "char": count_postings(self.chars, selected_packs & selected_types),
+      }
+
+
+def count_postings(postings: dict[str, int], bits: int) -> dict[str, int]:
+   """Number of rows of bits in each posting list."""
+   if not bits:
+      return dict.fromkeys(postings, 0)
+   return {key: (bits & posting).bit_count() for key, posting in postings.items()}
+
+
+def trigrams(text: str) -> set[str]:
+   return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+   """Trigram index over the search haystacks of the presets (see make_haystack).
+
+   Posting lists are sorted arrays of row indices. A search term is narrowed to the rows
+   containing all of its trigrams; the exact substring test then only runs on those.
+   Terms shorter than three characters can't be narrowed and fall back to a full scan.
+   """
+
+   def __init__(self, haystacks: list[str]) -> None:
+      self.size = len(haystacks)
+      self.all_bits = (1 << self.size) - 1
+      postings = defaultdict(list)
+      for i, haystack in enumerate(haystacks):
+         for gram in trigrams(haystack):
+            postings[gram].append(i)
+      self.postings = {gram: array("I", rows) for gram, rows in postings.items()}
+
+   def add(self, row: int, haystack: str) -> None:
+      """Index one more haystack, appended at the end of the list as row."""
+      self.size = max(self.size, row + 1)
+      self.all_bits = (1 << self.size) - 1
+      for gram in trigrams(haystack):
+         self.postings.setdefault(gram, array("I")).append(row)
+
+   def candidates(self, term: str) -> int:
+      """Return a bitset that is a superset of the rows whose haystack contains term."""
+      if len(term) < 3:
+         return self.all_bits
+      posting_lists = []
+      for gram in trigrams(term):
+         rows = self.postings.get(gram)
+         if rows is None:
+            return 0
+         posting_lists.append(rows)
+      # intersect starting from the rarest trigram so the working set stays small
+      posting_lists.sort(key=len)
+      rows = set(posting_lists[0])
+      for other in posting_lists[1:]:
+         rows.intersection_update(other)
+         if not rows:
+            return 0
+      return bits_from_indices(rows, self.size)
+
+
+class FuzzyIndex:
+   """Word index for fuzzy search (see search_query.Fuzzy).
+
+   The distinct words of the haystacks form a vocabulary far smaller than the preset
+   list, each word with the sorted rows containing it. A fuzzy term is only compared with
+   the vocabulary words that can be close enough: those starting with it when it allows
+   no typo, otherwise those sharing enough of its letter pairs, since one edit destroys
+   at most three of them. So the edit distance runs on a few words of the vocabulary,
+   never on every preset.
+   """
+
+   def __init__(self, haystacks: list[str]) -> None:
+      word_rows = defaultdict(list)
+      for row, haystack in enumerate(haystacks):
+         for word in set(split_words(haystack)):
+            word_rows[word].append(row)
+      self.words = sorted(word_rows)
+      self.rows = [array("I", word_rows[word]) for word in self.words]
+      postings = defaultdict(list)
+      for word_id, word in enumerate(self.words):
+         for gram in padded_bigrams(word):
+            postings[gram].append(word_id)
+      self.postings = {gram: array("I", word_ids) for gram, word_ids in postings.items()}
+
+   def candidate_words(self, term: str, max_distance: int) -> Iterable[int]:
+      """Ids of the words that may be within max_distance of term (or of a prefix of them)."""
+      if max_distance == 0:
+         # the words starting with term are a contiguous run of the sorted vocabulary
+         start = bisect_left(self.words, term)
+         end = bisect_left(self.words, term[:-1] + chr(ord(term[-1]) + 1))
+         return range(start, end)
+      grams = padded_bigrams(term)
+      needed = len(grams) - 3 * max_distance
+      if needed <= 0:
+         return range(len(self.words))
+      hits = defaultdict(int)
+      for gram in grams:
+         for word_id in self.postings.get(gram, ()):
+            hits[word_id] += 1
+      return [word_id for word_id, count in hits.items() if count >= needed]
+
+   def search(self, terms: Iterable[str]) -> list[int]:
+      """Rows that match every term, closest first and in row order within equal costs."""
+      total = None
+      for term in terms:
+         distance = max_edits(term)
+         matched = []
+         for word_id in self.candidate_words(term, distance):
+            cost = fuzzy_cost(term, self.words[word_id], distance)
+            if cost is not None:
+               matched.append((cost, word_id))
+         # cheapest last, so a row in several matched words keeps its best cost
+         matched.sort(reverse=True)
+         best = {}
+         for cost, word_id in matched:
+            best.update(dict.fromkeys(self.rows[word_id], cost))
+         total = best if total is None else {row: cost + best[row] for row, cost in total.items() if row in best}
+         if not total:
+            return []
+      if total is None:
+         return []
+      ranked = sorted(total)
+      ranked.sort(key=total.__getitem__)
+      return ranked
+
+
+def padded_bigrams(word: str) -> set[str]:
+   # the padding gives the first letter a pair of its own, which anchors matches to the word start
+   word = " " + word
+   return {word[i : i + 2] for i in range(len(word) - 1)}
@@ -0,0 +1,96 @@
+from collections import Counter
+
+
+UNASSIGNED = "UNASSIGNED"
+
+
+class PresetStats:
+   """Vocabularies, per-value counts and column widths of a preset library.
+
+   Built in one pass when the presets load and kept up to date by add() and remove(),
+   so the filter selectors and the grid never rescan the library. Vocabularies keep
+   first-seen order, which is the order the filter checkboxes are shown in.
+   """
+
+   def __init__(self, presets=()) -> None:
+      self.pack_counts: dict[str, int] = {}
+      self.type_counts: dict[str, int] = {}
+      self.char_counts: dict[str, int] = {}
+      # pack -> {type: count}
+      self.pack_types: dict[str, dict[str, int]] = {}
+      # one Counter of width -> number of presets per column, so a removal can lower the max
+      self.width_counts: list[Counter] = []
+      self.sorted_chars: list[str] | None = None
+      self.max_widths: list[int] | None = None
+      for preset in presets:
+         self.add(preset)
+
+   def add(self, preset) -> None:
+      _increment(self.pack_counts, preset.pack)
+      _increment(self.type_counts, preset.type)
+      _increment(self.pack_types.setdefault(preset.pack, {}), preset.type)
+      for char in preset.chars:
+         if _increment(self.char_counts, char):
+            self.sorted_chars = None
+      widths = preset.get_field_widths()
+      if not self.width_counts:
+         self.width_counts = [Counter() for _ in widths]
+      for counter, width in zip(self.width_counts, widths):
+         counter[width] += 1
+      if self.max_widths is not None:
+         self.max_widths = [max(current, width) for current, width in zip(self.max_widths, widths)]
+
+   def remove(self, preset) -> None:
+      _decrement(self.pack_counts, preset.pack)
+      _decrement(self.type_counts, preset.type)
+      pack_types = self.pack_types[preset.pack]
+      _decrement(pack_types, preset.type)
+      if not pack_types:
+         del self.pack_types[preset.pack]
+      for char in preset.chars:
+         if _decrement(self.char_counts, char):
+            self.sorted_chars = None
+      for counter, width in zip(self.width_counts, preset.get_field_widths()):
+         counter[width] -= 1
+         if not counter[width]:
+            del counter[width]
+      self.max_widths = None
+
+   def get_max_widths(self) -> list[int]:
+      if self.max_widths is None:
+         self.max_widths = [max(counter, default=0) for counter in self.width_counts]
+      return list(self.max_widths)
+
+   def get_packs(self) -> list[str]:
+      return list(self.pack_counts)
+
+   def get_types(self, pack: str = "") -> list[str]:
+      if pack:
+         return list(self.pack_types.get(pack, ()))
+      return list(self.type_counts)
+
+   def get_chars(self) -> list[str]:
+      """All chars sorted alphabetically, with UNASSIGNED (if present) last."""
+      if self.sorted_chars is None:
+         chars = sorted(char for char in self.char_counts if char != UNASSIGNED)
+         if UNASSIGNED in self.char_counts:
+            chars.append(UNASSIGNED)
+         self.sorted_chars = chars
+      return list(self.sorted_chars)
+
+
+def _increment(counts: dict[str, int], value: str) -> bool:
+   """Count value; True when it is new to the vocabulary."""
+   count = counts.get(value, 0)
+   counts[value] = count + 1
+   return count == 0
+
+
+def _decrement(counts: dict[str, int], value: str) -> bool:
+   """Uncount value; True when it has left the vocabulary."""
+   count = counts[value] - 1
+   if count:
+      counts[value] = count
+      return False
+   del counts[value]
+   return True
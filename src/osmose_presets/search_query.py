@@ -0,0 +1,357 @@
+import re
+from functools import lru_cache
+
+
+# a token is a quoted phrase, a parenthesis or a run of anything else up to the next space
+_TOKEN_PATTERN = re.compile(r'"([^"]*)"?|(\()|(\))|[^\s()"]+')
+_OPERATORS = ("AND", "OR", "NOT")
+# a word starting with one of these restricts the rest of it to a single preset field
+_FIELD_PATTERN = re.compile(r"(pack|type|char|cc0|pgm):", re.IGNORECASE)
+_NUMBER_FIELDS = ("cc0", "pgm")
+# a search starting with this is a fuzzy search, see Fuzzy
+FUZZY_PREFIX = "~"
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def make_haystack(pack: str, type_: str, cc0: int, pgm: int, name: str, chars) -> str:
+   """The lowercased text an unqualified search term is matched against, one line per field."""
+   return "\n".join((pack, type_, str(cc0), str(pgm), name, *chars)).lower()
+
+
+def split_words(text: str) -> list[str]:
+   """The words of text, as the fuzzy search sees them."""
+   return _WORD_PATTERN.findall(text)
+
+
+def max_edits(term: str) -> int:
+   """Typos a fuzzy term tolerates: none up to three letters, one up to seven, then two."""
+   return 0 if len(term) <= 3 else 1 if len(term) <= 7 else 2
+
+
+def fuzzy_cost(term: str, word: str, max_distance: int) -> int | None:
+   """Rank cost of word for a fuzzy term, lower is closer, or None if it is too far off.
+
+   The edit distance counts insertions, deletions, substitutions and swaps of two
+   neighbouring letters, and is taken to the closest prefix of word, so a term also
+   matches the words it is still being typed towards. The cost is twice that distance,
+   plus one unless the whole word is that close.
+   """
+   # previous[j] is the distance between the term read so far and word[:j], before is the row above it
+   before = None
+   previous = list(range(len(word) + 1))
+   for i, letter in enumerate(term, 1):
+      current = [i]
+      for j, other in enumerate(word, 1):
+         distance = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (letter != other))
+         if before is not None and j > 1 and letter == word[j - 2] and term[i - 2] == other:
+            distance = min(distance, before[j - 2] + 1)
+         current.append(distance)
+      if min(current) > max_distance:
+         return None
+      before, previous = previous, current
+   distance = min(previous)
+   return 2 * distance + (previous[-1] != distance)
+
+
+class Term:
+   """Substring match against a preset's haystack (see make_haystack).
+
+   The text is lowercased when the query is parsed and the haystack when the presets
+   load, so matching is case-insensitive without lowercasing anything per row.
+
+   Every node matches (haystack, presets, row), where presets[row] is the preset the
+   haystack belongs to; only Field reads it, so the other nodes never make a columnar
+   store build a Preset. Every node can also narrow a search through a trigram index:
+   candidates() returns a bitset that is guaranteed to contain every row the node matches.
+   """
+
+   __slots__ = ("text",)
+
+   def __init__(self, text: str) -> None:
+      self.text = text.lower()
+
+   def matches(self, haystack: str, presets=None, row: int = -1) -> bool:
+      return self.text in haystack
+
+   def candidates(self, index) -> int:
+      return index.candidates(self.text)
+
+   def __repr__(self) -> str:
+      return f"Term({self.text!r})"
+
+
+class Field:
+   """field:value match against one field of the preset itself.
+
+   pack, type and char match when the value is a substring of the field (of any char);
+   cc0 and pgm need the exact number. Verdicts are memoised per distinct field value,
+   so each pack, type or char is lowercased once per query rather than once per row.
+   """
+
+   __slots__ = ("name", "text", "number", "verdicts")
+
+   def __init__(self, name: str, text: str) -> None:
+      self.name = name.lower()
+      self.text = text.lower()
+      self.number = int(self.text) if self.name in _NUMBER_FIELDS and self.text.isdigit() else None
+      self.verdicts: dict[str, bool] = {}
+
+   def matches(self, haystack: str, presets=None, row: int = -1) -> bool:
+      if presets is None:
+         return False
+      preset = presets[row]
+      if self.name in _NUMBER_FIELDS:
+         return getattr(preset, self.name) == self.number
+      values = preset.chars if self.name == "char" else (getattr(preset, self.name),)
+      for value in values:
+         verdict = self.verdicts.get(value)
+         if verdict is None:
+            verdict = self.verdicts[value] = self.text in value.lower()
+         if verdict:
+            return True
+      return False
+
+   def candidates(self, index) -> int:
+      # every field is part of the haystack, so its trigrams still narrow the search
+      if self.name in _NUMBER_FIELDS:
+         return 0 if self.number is None else index.candidates(str(self.number))
+      return index.candidates(self.text)
+
+   def __repr__(self) -> str:
+      return f"Field({self.name!r}, {self.text!r})"
+
+
+class Fuzzy:
+   """~ search: every term must be within max_edits() typos of some word of the haystack.
+
+   matches() checks one haystack; a preset list is searched and ranked through a
+   FuzzyIndex instead, which only compares the terms with likely words.
+   """
+
+   __slots__ = ("terms",)
+
+   def __init__(self, terms: tuple[str, ...]) -> None:
+      self.terms = terms
+
+   def matches(self, haystack: str, presets=None, row: int = -1) -> bool:
+      words = set(split_words(haystack))
+      return all(any(fuzzy_cost(term, word, max_edits(term)) is not None for word in words) for term in self.terms)
+
+   def candidates(self, index) -> int:
+      return index.all_bits
+
+   def __repr__(self) -> str:
+      return f"Fuzzy{self.terms!r}"
+
+
+class And:
+   __slots__ = ("children",)
+
+   def __init__(self, children: tuple) -> None:
+      self.children = children
+
+   def matches(self, haystack: str, presets=None, row: int = -1) -> bool:
+      for child in self.children:
+         if not child.matches(haystack, presets, row):
+            return False
+      return True
+
+   def candidates(self, index) -> int:
+      bits = index.all_bits
+      for child in self.children:
+         bits &= child.candidates(index)
+      return bits
+
+   def __repr__(self) -> str:
+      return f"And{self.children!r}"
+
+
+class Or:
+   __slots__ = ("children",)
+
+   def __init__(self, children: tuple) -> None:
+      self.children = children
+
+   def matches(self, haystack: str, presets=None, row: int = -1) -> bool:
+      for child in self.children:
+         if child.matches(haystack, presets, row):
+            return True
+      return False
+
+   def candidates(self, index) -> int:
+      bits = 0
+      for child in self.children:
+         bits |= child.candidates(index)
+      return bits
+
+   def __repr__(self) -> str:
+      return f"Or{self.children!r}"
+
+
+class Not:
+   __slots__ = ("child",)
+
+   def __init__(self, child) -> None:
+      self.child = child
+
+   def matches(self, haystack: str, presets=None, row: int = -1) -> bool:
+      return not self.child.matches(haystack, presets, row)
+
+   def candidates(self, index) -> int:
+      # the child's candidates are only a superset, so their complement proves nothing
+      return index.all_bits
+
+   def __repr__(self) -> str:
+      return f"Not({self.child!r})"
+
+
+class _Parser:
+   """Recursive descent parser for the search box syntax.
+
+   OR binds loosest, then AND, then NOT. Parentheses group and double quotes make a
+   literal phrase. Consecutive plain words form a single term, so "acid bass" still
+   means the substring "acid bass". A word starting with pack:, type:, char:, cc0: or
+   pgm: is a Field term whose value is the rest of the word, or the quoted phrase right
+   after the colon (type:"elec piano"). The parser is lenient: a dangling operator,
+   an empty field or an unbalanced parenthesis is dropped rather than raising while the
+   user is typing.
+   """
+
+   def __init__(self, text: str) -> None:
+      self.text = text
+      self.tokens = list(_TOKEN_PATTERN.finditer(text))
+      self.pos = 0
+
+   def peek(self) -> str | None:
+      if self.pos >= len(self.tokens):
+         return None
+      token = self.tokens[self.pos]
+      if token.group(1) is not None:
+         return "PHRASE"
+      if token.group(0) in _OPERATORS + ("(", ")"):
+         return token.group(0)
+      return "FIELD" if _FIELD_PATTERN.match(token.group(0)) else "WORD"
+
+   def parse(self):
+      node = self.parse_or()
+      # skip a stray closing parenthesis and carry on with whatever follows it
+      while self.pos < len(self.tokens):
+         self.pos += 1
+         rest = self.parse_or()
+         node = _combine(And, [node, rest])
+      return node
+
+   def parse_or(self):
+      children = [self.parse_and()]
+      while self.peek() == "OR":
+         self.pos += 1
+         children.append(self.parse_and())
+      return _combine(Or, children)
+
+   def parse_and(self):
+      children = [self.parse_not()]
+      while self.peek() not in (None, "OR", ")"):
+         if self.peek() == "AND":
+            self.pos += 1
+         children.append(self.parse_not())
+      return _combine(And, children)
+
+   def parse_not(self):
+      if self.peek() == "NOT":
+         self.pos += 1
+         child = self.parse_not()
+         return Not(child) if child is not None else None
+      return self.parse_primary()
+
+   def parse_primary(self):
+      kind = self.peek()
+      if kind == "(":
+         self.pos += 1
+         node = self.parse_or()
+         if self.peek() == ")":
+            self.pos += 1
+         return node
+      if kind == "PHRASE":
+         phrase = self.tokens[self.pos].group(1)
+         self.pos += 1
+         return Term(phrase) if phrase else None
+      if kind == "FIELD":
+         word = self.tokens[self.pos].group(0)
+         field = _FIELD_PATTERN.match(word)
+         value = word[field.end() :]
+         self.pos += 1
+         if not value and self.peek() == "PHRASE" and self.tokens[self.pos].start() == self.tokens[self.pos - 1].end():
+            value = self.tokens[self.pos].group(1)
+            self.pos += 1
+         return Field(field.group(1), value) if value else None
+      if kind == "WORD":
+         start = self.tokens[self.pos].start()
+         end = self.tokens[self.pos].end()
+         self.pos += 1
+         while self.peek() == "WORD":
+            end = self.tokens[self.pos].end()
+            self.pos += 1
+         return Term(self.text[start:end])
+      return None
+
+
+def _combine(node_type, children: list):
+   children = [child for child in children if child is not None]
+   if not children:
+      return None
+   if len(children) == 1:
+      return children[0]
+   flattened = []
+   for child in children:
+      flattened.extend(child.children if isinstance(child, node_type) else (child,))
+   return node_type(tuple(flattened))
+
+
+def parse_query(search_term: str):
+   """Parse a search string into a query tree, or None when it matches everything.
+
+   A search starting with FUZZY_PREFIX is a Fuzzy query over the words that follow it;
+   the operators have no meaning there.
+   """
+   text = search_term.strip()
+   if text.startswith(FUZZY_PREFIX):
+      terms = tuple(split_words(text[len(FUZZY_PREFIX) :].lower()))
+      return Fuzzy(terms) if terms else None
+   return _Parser(search_term).parse()
+
+
+@lru_cache(maxsize=128)
+def compile_query(search_term: str):
+   """Cached parse_query, keyed by the raw search text."""
+   return parse_query(search_term)
+
+
+def _implies(new, old) -> bool:
+   if isinstance(new, Term) and isinstance(old, Term):
+      # anything containing "bass d" also contains "bass"
+      return old.text in new.text
+   if isinstance(new, Field) and isinstance(old, Field) and new.name == old.name and new.name not in _NUMBER_FIELDS:
+      return old.text in new.text
+   return repr(new) == repr(old)
+
+
+def narrows(new, old) -> bool:
+   """True when every string matched by query new is also matched by query old.
+
+   Only conjunctions are recognised: each AND term of old must be implied by some AND
+   term of new. That covers the as-you-type cases of appending characters to a term or
+   appending another AND term, which lets a caller refine the previous result set.
+   """
+   if old is None:
+      return True
+   if new is None:
+      return False
+   new_terms = new.children if isinstance(new, And) else (new,)
+   old_terms = old.children if isinstance(old, And) else (old,)
+   return all(any(_implies(new_term, old_term) for new_term in new_terms) for old_term in old_terms)
+
+
+def evaluate_search(search_term: str, target_string: str) -> bool:
+   """Match a search against a plain string; field:value terms never match one."""
+   query = compile_query(search_term)
+   return query is None or query.matches(target_string.lower())
@@ -1,12 +1,4 @@
-def evaluate_search(search_term, target_string):
-   # Split the search term by " OR " to handle the lowest precedence operator.
-   or_clauses = [clause.strip() for clause in search_term.split(" OR ")]
-   # Evaluate each "AND" clause independently.
-   # Using a generator expression for efficiency.
-   and_results = (all(term.strip() in target_string for term in clause.split(" AND ")) for clause in or_clauses)
-
-   # Step 3: The final result is TRUE if any of the "AND" clauses were a match.
-   return any(and_results)
+from osmose_presets.search_query import evaluate_search
 
 
 if __name__ == "__main__":
@@ -32,3 +24,23 @@ if __name__ == "__main__":
    # Test 5: No match
    search5 = "mouse AND rabbit OR unicorn"
    print(f'Query: "{search5}" -> Match: {evaluate_search(search5, target_text)}')
+
+   # Test 6: NOT and parentheses
+   search6 = "fox AND NOT (cat OR mouse)"
+   print(f'Query: "{search6}" -> Match: {evaluate_search(search6, target_text)}')
+
+   # Test 7: Quoted phrase keeps operator words literal
+   search7 = '"brown fox" AND "lazy dog"'
+   print(f'Query: "{search7}" -> Match: {evaluate_search(search7, target_text)}')
+
+   # Test 8: Matching ignores case
+   search8 = "QUICK AND Lazy"
+   print(f'Query: "{search8}" -> Match: {evaluate_search(search8, target_text)}')
+
+   # Test 9: Field terms only match presets, never a plain string
+   search9 = "type:bass"
+   print(f'Query: "{search9}" -> Match: {evaluate_search(search9, target_text)}')
+
+   # Test 10: A leading ~ makes a fuzzy search that tolerates typos
+   search10 = "~quikc brwn"
+   print(f'Query: "{search10}" -> Match: {evaluate_search(search10, target_text)}')
@@ -1,5 +1,6 @@
 import mido
 import time
+from osmose_presets.midi_timing import MidiTiming
 
 
 def send_preset_change(port: str, cc: int, pgm: int):
@@ -16,7 +17,7 @@ def send_preset_change(port: str, cc: int, pgm: int):
    print(f"Sending CC message: {cc_msg.hex()}")
    output.send(cc_msg)
 
-   time.sleep(0.4)
+   time.sleep(MidiTiming.get_profile(port).bank_select_delay)
 
    pgm_msg = mido.Message("program_change", channel=0, program=pgm)
    print(f"Sending PGM message: {pgm_msg.hex()}")